@@ -6,14 +6,13 @@ Load configuration files and provide access to their settings.
 """
 
 import os
+import sys
 from pathlib import Path
+import copy
+import functools
 import logging
 import datetime
-import shlex
-import subprocess
 from urllib.parse import urlparse
-import yaml
-import glob
 
 from plaidcloud.rpc.file_helpers import makedirs
 
@@ -34,28 +33,253 @@ CONFIG_DIR = '.plaid'
 # Module level CONFIG dict - mutable, and importable from this module.
 CONFIG = {}
 
+# Paths that are always formatted relative to PROJECT_ROOT when paths are built.
+_PROJECT_ROOT_PATHS = ('LOCAL_STORAGE', 'DEBUG', 'REPORTS')
+
+# Environment variables that must all be set when running inside PlaidCloud (UDF or Jupyter), in the order
+# PlaidConfig unpacks them.
+_REQUIRED_ENVIRONMENT_VARIABLES = (
+    '__PLAID_RPC_URI__',
+    '__PLAID_RPC_AUTH_TOKEN__',
+    '__PLAID_PROJECT_ID__',
+    '__PLAID_WORKSPACE_UUID__',
+    '__PLAID_WORKFLOW_ID__',
+    '__PLAID_STEP_ID__',
+)
+
+# Merged settings of each config directory loaded by PlaidConfig, keyed by directory path.
+_DIR_CACHE = {}
+
+# Directories this process has already made sure exist.
+_CREATED_DIRS = set()
+
 
 def get_dict():
     return CONFIG
 
 
+class _FormatDefault(dict):
+    """Mapping for str.format_map that leaves unknown placeholders in place"""
+    def __missing__(self, key):
+        return '{' + key + '}'
+
+
+@functools.lru_cache(maxsize=None)
+def _yaml_loader():
+    """Gets the yaml loader to use, importing yaml on first use rather than at module import.
+
+    Prefers the libyaml backed loader, a drop-in replacement for SafeLoader that parses several times faster.
+
+    Returns:
+        type: The yaml Loader class"""
+    import yaml
+
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    if loader is yaml.SafeLoader:
+        logger.warning('PyYAML was built without libyaml, falling back to the pure python SafeLoader. '
+                       'Install libyaml-dev and reinstall PyYAML for faster config loading.')
+    return loader
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_yaml_file(path, mtime_ns, size):
+    """Parses a yaml file. Cached on the file's identity so unchanged files are only parsed once.
+
+    Args:
+        path (str): The path to the yaml file
+        mtime_ns (int): The modification time of the file, used to invalidate the cache
+        size (int): The size of the file, used to invalidate the cache
+
+    Returns:
+        The parsed yaml document"""
+    import yaml
+
+    # Hand libyaml the raw bytes, it detects the encoding itself without a decode pass in python
+    with open(path, 'rb') as config_fp:
+        return yaml.load(config_fp, Loader=_yaml_loader())
+
+
+def _file_signature(path):
+    """Identifies a version of a file, for use as a cache key.
+
+    Args:
+        path (str): The path to the file
+
+    Returns:
+        tuple: The absolute path, modification time and size of the file"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def _load_yaml_file(path):
+    """Loads a yaml file, re-using the previously parsed result if the file has not changed.
+
+    Args:
+        path (str): The path to the yaml file
+
+    Returns:
+        A copy of the parsed yaml document, safe for the caller to mutate"""
+    return copy.deepcopy(_parse_yaml_file(*_file_signature(path)))
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_json_file(path, mtime_ns, size):
+    """Parses a json file. Cached on the file's identity so unchanged files are only parsed once.
+
+    Args:
+        path (str): The path to the json file
+        mtime_ns (int): The modification time of the file, used to invalidate the cache
+        size (int): The size of the file, used to invalidate the cache
+
+    Returns:
+        The parsed json document"""
+    import orjson
+
+    with open(path, 'rb') as config_fp:
+        return orjson.loads(config_fp.read())
+
+
+def _load_plaid_conf(path):
+    """Loads a plaid.conf file, which is yaml unless its name ends with .json.
+
+    Args:
+        path (str): The path to the plaid.conf file
+
+    Returns:
+        dict: A copy of the parsed settings, safe for the caller to mutate"""
+    if path.endswith('.json'):
+        return copy.deepcopy(_parse_json_file(*_file_signature(path)))
+    return _load_yaml_file(path)
+
+
+def write_plaid_conf(path, conf):
+    """Writes plaid.conf settings, as json if the path ends with .json and yaml otherwise.
+
+    Args:
+        path (str): The path to write to
+        conf (dict): The settings to write"""
+    if path.endswith('.json'):
+        import orjson
+
+        with open(path, 'wb') as config_fp:
+            config_fp.write(orjson.dumps(conf, option=orjson.OPT_INDENT_2))
+    else:
+        import yaml
+
+        with open(path, 'w') as config_fp:
+            config_fp.write(yaml.safe_dump(conf))
+
+
+def convert_plaid_conf(path, json_path=None):
+    """Writes a json copy of a yaml plaid.conf, which is faster to load. Point PlaidConfig's config_path at the
+    copy to use it.
+
+    Args:
+        path (str): The path to the yaml plaid.conf
+        json_path (str, optional): Where to write the json copy. Defaults to the same path with .json appended
+
+    Returns:
+        str: The path of the json copy"""
+    json_path = json_path or f'{path}.json'
+    write_plaid_conf(json_path, _load_yaml_file(path))
+    return json_path
+
+
+def _list_yaml_files(dir_path):
+    """Lists the loadable yaml files in a directory, skipping any whose name starts with '__'.
+
+    Args:
+        dir_path (str): The directory to search
+
+    Returns:
+        list: The paths of the yaml files found, empty if the directory can't be read"""
+    try:
+        with os.scandir(dir_path) as entries:
+            return [
+                entry.path for entry in entries
+                if entry.name.endswith('.yaml') and not entry.name.startswith('__') and entry.is_file()
+            ]
+    except OSError:
+        return []
+
+
+def _load_config_dir(dir_path):
+    """Loads and merges the yaml files in a config directory.
+
+    The merged result is cached against the directory's modification time and the signature of each file in it,
+    so that a process constructing many configs only lists and parses the directory once.
+
+    Args:
+        dir_path (str): The config directory
+
+    Returns:
+        dict: A copy of the merged settings, safe for the caller to mutate"""
+    dir_path = os.path.abspath(dir_path)
+    try:
+        dir_mtime = os.stat(dir_path).st_mtime_ns
+    except OSError:
+        return {}
+
+    try:
+        cached_mtime, signatures, merged = _DIR_CACHE[dir_path]
+        if cached_mtime == dir_mtime and all(_file_signature(sig[0]) == sig for sig in signatures):
+            return copy.deepcopy(merged)
+    except (KeyError, OSError):
+        pass
+
+    signatures = []
+    merged = {}
+    for file_path in _list_yaml_files(dir_path):
+        try:
+            signature = _file_signature(file_path)
+            merged.update(_parse_yaml_file(*signature))
+            signatures.append(signature)
+        except:
+            logger.exception("Could not load config from %s", file_path)
+
+    _DIR_CACHE[dir_path] = (dir_mtime, signatures, merged)
+    return copy.deepcopy(merged)
+
+
 def load_config_files(paths):
     """(Re)load config file(s) in use by the configuration. Newer config keys replace older config keys.
 
     Args:
         paths (:type:`list` of :type:`str`): The paths to the config files to load"""
 
+    merged = {}
     for path in paths:
         try:
             if path[-5:] == '.yaml' and path[-10:] != '-yaml.json' and not os.path.basename(path).startswith('__'):
-                with open(path, 'r') as config_fp:
-                    CONFIG.update(yaml.safe_load(config_fp))
+                merged.update(_load_yaml_file(path))
             else:
-                logger.warning("Skipping: Will not load config from {}".format(path))
+                logger.warning("Skipping: Will not load config from %s", path)
         except:
-            logger.exception("Could not load config from {}".format(path))
+            logger.exception("Could not load config from %s", path)
+    CONFIG.update(merged)
+
 
+def _read_git_head(git_dir):
+    """Resolves HEAD by reading the git metadata files directly, avoiding a git subprocess.
 
+    Args:
+        git_dir (Path): The path to the .git directory
+
+    Returns:
+        str: The full hash of the commit HEAD points to
+
+    Raises:
+        OSError: If HEAD or the ref it points to cannot be read, e.g. packed refs or a worktree"""
+    with open(git_dir / 'HEAD', 'r') as head_fp:
+        head = head_fp.read().strip()
+    if head.startswith('ref: '):
+        with open(git_dir / head[5:], 'r') as ref_fp:
+            head = ref_fp.read().strip()
+    return head
+
+
+@functools.lru_cache(maxsize=32)
 def get_git_short_hash(filepath):
     """Get the short git hash of the code.
 
@@ -63,6 +287,8 @@ def get_git_short_hash(filepath):
     directory which houses the codebase (which is likely to occur in a
     production environment and many other instances).
 
+    The result is cached, as the commit a process is running rarely changes.
+
     Args:
         filepath (str): The file path of the git repo
 
@@ -72,14 +298,20 @@ def get_git_short_hash(filepath):
     if filepath is None:
         return ''
 
-    py_file_dir = os.path.dirname(os.path.abspath(filepath)).rstrip(os.sep)
-    git_wt_dir = py_file_dir.rsplit(os.sep, 1)[0]
-    git_dir = "{}{}.git".format(git_wt_dir, os.sep)
-    git_cmd = "git rev-parse --short --git-dir={} --work-tree={} HEAD" \
-              .format(git_dir, git_wt_dir)
+    git_wt_dir = Path(filepath).resolve().parent.parent
+    git_dir = git_wt_dir / '.git'
     try:
-        git_p = subprocess.Popen(shlex.split(git_cmd), stdout=subprocess.PIPE)
-        return git_p.communicate()[0].strip()
+        return _read_git_head(git_dir)[:7]
+    except OSError:
+        # Fall back to asking git for unusual layouts
+        pass
+
+    import subprocess
+
+    git_cmd = ['git', f'--git-dir={git_dir}', f'--work-tree={git_wt_dir}', 'rev-parse', '--short', 'HEAD']
+    try:
+        git_p = subprocess.run(git_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=False, timeout=2)
+        return git_p.stdout.strip().decode()
     except:
         return ''
 
@@ -114,25 +346,62 @@ def initialize(filepath=None):
         #          might be a good reason for it I don't understand.
 
 
+@functools.lru_cache(maxsize=32)
+def _hostname_from_uri(uri):
+    """Gets the host (and port) of a uri, or 'Unknown' if it can't be parsed.
+
+    Args:
+        uri (str): The uri to parse
+
+    Returns:
+        str: The network location of the uri
+    """
+    try:
+        return urlparse(uri).netloc
+    except ValueError:
+        return 'Unknown'
+
+
+def _makedirs_once(path):
+    """Creates a directory, unless this process already has and it is still there.
+
+    Args:
+        path (str): The directory to create
+    """
+    if path in _CREATED_DIRS and os.path.isdir(path):
+        return
+    makedirs(path)
+    _CREATED_DIRS.add(path)
+    logger.debug("Created directory '%s'", path)
+
+
 def create_necessary_directories():
     """Create dirs listed in config."""
 
     local_storage_path = CONFIG['paths']['LOCAL_STORAGE']
     for d in CONFIG['paths']['create']:
         path = d.format(PROJECT_ROOT=CONFIG['paths']['PROJECT_ROOT']) #TODO, maybe add other path substitute options here.
-        makedirs(path)
-        logger.debug("Created directory '%s'", d)
+        _makedirs_once(path)
+
+
+def _set_pandas_options(opts):
+    """Sets pandas chained_assignment option from config.
+
+    Importing pandas is slow, so this only applies if something has already imported it.
+
+    Args:
+        opts (dict): The options section of the config
+    """
+    pd = sys.modules.get('pandas')
+    if pd is None:
+        logger.debug('Not setting pandas related option - pandas has not been imported.')
+        return
+    pd.options.mode.chained_assignment = opts.get('pandas_chained_assignment')
 
 
 def set_runtime_options():
     """Sets pandas chained_assignment option from config."""
-    try:
-        import pandas as pd
-
-        opts = CONFIG.get('options', {})
-        pd.options.mode.chained_assignment = opts.get('pandas_chained_assignment')
-    except ImportError:
-        logger.info('Not setting pandas related option - pandas is not installed.')
+    _set_pandas_options(CONFIG.get('options', {}))
 
 
 def build_paths(working_user, config_path):
@@ -150,7 +419,7 @@ def build_paths(working_user, config_path):
 
     logger.debug("No files found at the user's home configuration paths. "
                  "This results in using the packaged defaults.")
-    paths = glob.glob(config_path+"/*.yaml")
+    paths = _list_yaml_files(config_path)
     load_config_files(paths)
 
     try:
@@ -160,9 +429,10 @@ def build_paths(working_user, config_path):
         print('{}, {}'.format(config_path, e))
         print(config_path)
 
-    CONFIG['paths']['LOCAL_STORAGE'] = CONFIG['paths']['LOCAL_STORAGE'].format(PROJECT_ROOT=CONFIG['paths']['PROJECT_ROOT'])
-    CONFIG['paths']['DEBUG'] = CONFIG['paths']['DEBUG'].format(PROJECT_ROOT=CONFIG['paths']['PROJECT_ROOT'])
-    CONFIG['paths']['REPORTS'] = CONFIG['paths']['REPORTS'].format(PROJECT_ROOT=CONFIG['paths']['PROJECT_ROOT'])
+    paths = CONFIG['paths']
+    substitutions = {'PROJECT_ROOT': paths['PROJECT_ROOT']}
+    for path_id in _PROJECT_ROOT_PATHS:
+        paths[path_id] = paths[path_id].format_map(substitutions)
 
     #TODO: Deprecate this.
     CONFIG['options']['LOCAL_STORAGE'] = CONFIG['paths']['LOCAL_STORAGE']
@@ -191,33 +461,16 @@ def setup_scaffolding(config_path='', file_location=''):
 
 
 class PlaidConfig:
-    _C = {}
-    _working_user = os.path.expanduser('~')
-    # Members for local and remote
-    rpc_uri = ''
-    auth_token = ''
-    _project_id = ''
-    _workflow_id = ''
-    _step_id = ''
-    workspace_uuid = ''
-    verify_ssl = True
-    # Members used for local setup
-    cfg_path = ''
-    user_id = 0
-    client_id = ''
-    client_secret = ''
-    hostname = ''
-    auth_uri = ''
-    token_uri = ''
-    redirect_uri = ''
-    name = ''
-    auth_code = None
-    # Members used inside the UDFs
-    is_local = False
-    debug = False
-    fetch = True
-    cache_locally = False
-    write_from_local = False
+    __slots__ = (
+        '_C', '_working_user',
+        # Members for local and remote
+        'rpc_uri', 'auth_token', '_project_id', '_workflow_id', '_step_id', 'workspace_uuid', 'verify_ssl',
+        # Members used for local setup
+        'cfg_path', 'user_id', 'client_id', 'client_secret', 'hostname', 'auth_uri', 'token_uri', 'redirect_uri',
+        'name', 'auth_code', 'realm', 'grant_type',
+        # Members used inside the UDFs
+        'is_local', 'debug', 'fetch', 'cache_locally', 'write_from_local',
+    )
 
     def __init__(self, config_path: [str, False], working_user=''):
         """
@@ -231,32 +484,59 @@ class PlaidConfig:
             config_path (str):  client repo's config directory.  It's where to look for client-specific config yaml.
             working_user (str, optional): local user or overridden (typically 'plaidlink') user. defaults to os.path.expanduser('~')
         """
+        self._C = {}
+        self._working_user = os.path.expanduser('~')
+        # Members for local and remote
+        self.rpc_uri = ''
+        self.auth_token = ''
+        self._project_id = ''
+        self._workflow_id = ''
+        self._step_id = ''
+        self.workspace_uuid = ''
+        self.verify_ssl = True
+        # Members used for local setup
+        self.cfg_path = ''
+        self.user_id = 0
+        self.client_id = ''
+        self.client_secret = ''
+        self.hostname = ''
+        self.auth_uri = ''
+        self.token_uri = ''
+        self.redirect_uri = ''
+        self.name = ''
+        self.auth_code = None
+        self.realm = ''
+        self.grant_type = 'code'
+        # Members used inside the UDFs
+        self.is_local = False
+        self.debug = False
+        self.fetch = True
+        self.cache_locally = False
+        self.write_from_local = False
+
         def _check_environment_variables():
+            env = os.environ
             try:
-                # If this is running in UDF or Jupyter notebook then an RPC connection is already available
-                # Grab config values put in environment variables
-                self.rpc_uri = os.environ['__PLAID_RPC_URI__']
-                self.auth_uri = os.environ.get('__PLAID_AUTH_URI__')
-                self.auth_token = os.environ['__PLAID_RPC_AUTH_TOKEN__']
-                self._project_id = os.environ['__PLAID_PROJECT_ID__']
-                self.workspace_uuid = os.environ['__PLAID_WORKSPACE_UUID__']
-                self._workflow_id = os.environ['__PLAID_WORKFLOW_ID__']
-                self._step_id = os.environ['__PLAID_STEP_ID__']
-                self.verify_ssl = os.environ.get('__PLAID_VERIFY_SSL__', 'True') == 'True'
-                self.is_local = False
-                try:
-                    self.hostname = urlparse(self.rpc_uri).netloc
-                except:
-                    self.hostname = 'Unknown'
-                logger.debug('Environment is configured, running PlaidCloud UDF on {}'.format(self.hostname))
-                return True
-            except:
+                (
+                    self.rpc_uri, self.auth_token, self._project_id, self.workspace_uuid, self._workflow_id,
+                    self._step_id,
+                ) = [env[key] for key in _REQUIRED_ENVIRONMENT_VARIABLES]
+            except KeyError:
                 # This must be running from some environment other than UDF or Jupyter
                 # Need to use a config file to setup connection
                 self.is_local = True
                 logger.debug("Environment not configured, running UDF Locally. Checking local configuration.")
                 return False
 
+            # If this is running in UDF or Jupyter notebook then an RPC connection is already available
+            # Grab the rest of the config values put in environment variables
+            self.auth_uri = env.get('__PLAID_AUTH_URI__')
+            self.verify_ssl = env.get('__PLAID_VERIFY_SSL__', 'True') == 'True'
+            self.is_local = False
+            self.hostname = _hostname_from_uri(self.rpc_uri)
+            logger.debug('Environment is configured, running PlaidCloud UDF on %s', self.hostname)
+            return True
+
         def _init_plaidcloud_config():
             self.is_local = False
             self.debug = False
@@ -298,29 +578,29 @@ class PlaidConfig:
             if not os.path.exists(self.cfg_path):
                 raise Exception('ERROR: No plaid.conf exists at the specified path: {}'.format(self.cfg_path))
 
-            with open(self.cfg_path, 'r') as cfg_file:
-                self._C['config'] = yaml.safe_load(cfg_file)
+            # Only the top-level keys are read here, but the whole document is kept as it's exposed via self.config
+            conf = self._C['config'] = _load_plaid_conf(self.cfg_path)
 
-            self.user_id = self.config['user_id']
-            self.client_id = self.config['client_id']
-            self.client_secret = self.config['client_secret']
-            self.hostname = self.config['hostname']
-            self.auth_uri = self.config.get('auth_uri', f'https://{self.hostname}/auth')
-            self.realm = self.config['realm']
+            self.user_id = conf['user_id']
+            self.client_id = conf['client_id']
+            self.client_secret = conf['client_secret']
+            self.hostname = conf['hostname']
+            self.auth_uri = conf.get('auth_uri', f'https://{self.hostname}/auth')
+            self.realm = conf['realm']
             self.token_uri = f'{self.auth_uri}/realms/{self.realm}/protocol/openid-connect/token'
             self.rpc_uri = f'https://{self.hostname}/json-rpc/'
 
-            self.redirect_uri = self.config.get('redirect_uri', '')
-            self.auth_token = self.config.get('auth_token')
-            self.workspace_uuid = self.config['workspace_uuid']
-            self._project_id = self.config.get('project_id', '')
-            self._workflow_id = self.config.get('workflow_id', '')
-            self._step_id = self.config.get('step_id', '')
-            self.name = self.config.get('name')
-            self.grant_type = self.config.get("grant_type", "code")
+            self.redirect_uri = conf.get('redirect_uri', '')
+            self.auth_token = conf.get('auth_token')
+            self.workspace_uuid = conf['workspace_uuid']
+            self._project_id = conf.get('project_id', '')
+            self._workflow_id = conf.get('workflow_id', '')
+            self._step_id = conf.get('step_id', '')
+            self.name = conf.get('name')
+            self.grant_type = conf.get("grant_type", "code")
 
             # No need for an auth code if we already have a token.
-            self.auth_code = self.config.get('auth_code') if not self.auth_token else None
+            self.auth_code = conf.get('auth_code') if not self.auth_token else None
 
             if all([
                 isinstance(self._project_id, str),
@@ -332,16 +612,7 @@ class PlaidConfig:
                 os.environ['__PLAID_STEP_ID__'] = self._step_id
 
         def _load_config_yaml_files():
-            config_files = glob.glob(os.path.dirname(self.cfg_path) + "/*.yaml")
-            for file_path in config_files:
-                if file_path.endswith('.yaml') and not file_path.startswith('__'):
-                    try:
-                        with open(file_path, 'r') as config_fp:
-                            self._C.update(yaml.safe_load(config_fp))
-                    except:
-                        logger.exception("Could not load config from {}".format(file_path))
-                else:
-                    logger.warning("Skipping: Will not load config from {}".format(file_path))
+            self._C.update(_load_config_dir(os.path.dirname(self.cfg_path) or os.curdir))
 
         def _build_paths():
             """
@@ -359,30 +630,28 @@ class PlaidConfig:
                 try:
                     paths['PROJECT_ROOT'] = paths['PROJECT_ROOT'].format(WORKING_USER=self._working_user)
                 except Exception:
-                    logger.exception('Error Reading Paths from {}'.format(config_path))
+                    logger.exception('Error Reading Paths from %s', config_path)
 
-                project_root = paths['PROJECT_ROOT']
-                paths['LOCAL_STORAGE'] = paths['LOCAL_STORAGE'].format(PROJECT_ROOT=project_root)
-                paths['DEBUG'] = paths['DEBUG'].format(PROJECT_ROOT=project_root)
-                paths['REPORTS'] = paths['REPORTS'].format(PROJECT_ROOT=project_root)
+                substitutions = {'PROJECT_ROOT': paths['PROJECT_ROOT']}
+                for path_id in _PROJECT_ROOT_PATHS:
+                    paths[path_id] = paths[path_id].format_map(substitutions)
+
+                # Resolve every path template once here, so that path() doesn't have to on each call
+                substitutions = self._path_substitutions()
+                for path_id, template in paths.items():
+                    if isinstance(template, str):
+                        paths[path_id] = template.format_map(substitutions)
 
         def _create_necessary_directories():
             """Create dirs listed in config."""
             for d in self._C.get('paths', {}).get('create', []):
                 # TODO - maybe add other path substitution options here.
                 path_to_create = d.format(PROJECT_ROOT=self._C['paths']['PROJECT_ROOT'])
-                makedirs(path_to_create)
-                logger.debug("Created directory '%s'", path_to_create)
+                _makedirs_once(path_to_create)
 
         def _set_runtime_options():
             """Sets pandas chained_assignment option from config."""
-            try:
-                import pandas as pd
-
-                opts = self._C.get('options', {})
-                pd.options.mode.chained_assignment = opts.get('pandas_chained_assignment')
-            except ImportError:
-                logger.info('Not setting pandas related option - pandas is not installed.')
+            _set_pandas_options(self._C.get('options', {}))
 
         if config_path is False: # allow to call super from PlaidXLConfig without effect
             return
@@ -404,21 +673,21 @@ class PlaidConfig:
     def paths(self):
         return self.all.get('paths', {})
 
+    def _path_substitutions(self):
+        return _FormatDefault({
+            'WORKING_USER': self._working_user,
+            'PROJECT_ROOT': self.paths['PROJECT_ROOT'],
+            'LOCAL_STORAGE': self.paths['LOCAL_STORAGE'],
+            'DEBUG': self.paths['DEBUG']
+        })
+
     def path(self, path_id):
         result = self.paths[path_id]
         if isinstance(result, str):
-            class Default(dict):
-                def __missing__(self, key):
-                    return '{' + key + '}'
-
-            return os.path.normpath(result.format_map(
-                Default({
-                    'WORKING_USER': self._working_user,
-                    'PROJECT_ROOT': self.paths['PROJECT_ROOT'],
-                    'LOCAL_STORAGE': self.paths['LOCAL_STORAGE'],
-                    'DEBUG': self.paths['DEBUG']
-                })
-            ))
+            if '{' in result:
+                # Not resolved when the config was loaded, e.g. a path added afterwards
+                result = result.format_map(self._path_substitutions())
+            return os.path.normpath(result)
         return result
 
     @property
@@ -450,6 +719,7 @@ class PlaidConfig:
 
 class PlaidXLConfig(PlaidConfig):
     def __init__(self, *, rpc_uri: str, auth_token: str, workspace_id: str, project_id: str):
+        super().__init__(False)
         self.rpc_uri = rpc_uri
         # self.auth_uri = os.environ.get('__PLAID_AUTH_URI__')
         self.auth_token = auth_token
@@ -458,7 +728,6 @@ class PlaidXLConfig(PlaidConfig):
         # self._workflow_id = os.environ['__PLAID_WORKFLOW_ID__']
         # self._step_id = os.environ['__PLAID_STEP_ID__']
         self.is_local = False
-        super().__init__(False)
 
     @property
     def project_id(self):
@@ -491,22 +760,24 @@ def find_workspace_root(path=None):
     else:
         path = Path.cwd()
 
-    def recurse(path):
-        if (
-            path.joinpath(CONFIG_NAME).exists()
-            or path.joinpath(CONFIG_DIR, CONFIG_NAME).exists()
-        ):
-            return path
-        elif path == path.parent:
-            # We've hit the filesystem root
-            raise Exception(
-                f'Could not find {CONFIG_NAME}, starting at {str(path)}, '
-                f'checking sub_folder {CONFIG_DIR}'
-            )
-        else:
-            return recurse(path.parent)
-
-    return recurse(Path.cwd())
+    for parent in (path, *path.parents):
+        # A single directory listing per level rather than a stat for each candidate location
+        try:
+            with os.scandir(parent) as entries:
+                found = {entry.name: entry for entry in entries if entry.name in (CONFIG_NAME, CONFIG_DIR)}
+        except OSError:
+            continue
+        if CONFIG_NAME in found:
+            return parent
+        config_dir = found.get(CONFIG_DIR)
+        if config_dir is not None and config_dir.is_dir() and parent.joinpath(CONFIG_DIR, CONFIG_NAME).exists():
+            return parent
+
+    # We've hit the filesystem root
+    raise Exception(
+        f'Could not find {CONFIG_NAME}, starting at {str(path)}, '
+        f'checking sub_folder {CONFIG_DIR}'
+    )
 
 # TARGET_WORKING_DIRECTORY = os.path.abspath(os.path.dirname(__file__))
 # CONFIG_PATH = ('{}/config/'.format(TARGET_WORKING_DIRECTORY))
@@ -1,19 +1,29 @@
 # coding=utf-8
 
+import contextvars
+import functools
 import os
+import shutil
+import socket
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
 
 import urllib3
 import urllib3.exceptions
 import requests
 from requests.adapters import HTTPAdapter
-from requests_futures.sessions import FuturesSession
+from urllib3.connection import HTTPConnection
 from urllib3.util.retry import Retry
 import orjson as json
-from packaging import version
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
-from toolz.dicttoolz import assoc
 
 from plaidcloud.rpc.orjson import unsupported_object_json_encoder
 from plaidcloud.rpc.remote.rpc_tools import PlainRPCCommon
@@ -27,20 +37,214 @@ __maintainer__ = 'Adams Tower <adams.tower@tartansolutions.com>'
 __copyright__ = '© Copyright 2019-2023, Tartan Solutions, Inc'
 __license__ = 'Apache 2.0'
 
-STREAM_ENDPOINTS = {
+STREAM_ENDPOINTS = frozenset({
     'analyze/query/download_csv',
     'analyze/query/download_dataframe',
     'document/view/download_stream',
-}
+})
 
 download_folder = os.path.join(tempfile.gettempdir(), "plaid/download")
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+# numpy arrays and scalars are serialized natively, rather than failing in the default encoder
+JSON_OPTIONS = json.OPT_NAIVE_UTC | json.OPT_NON_STR_KEYS | json.OPT_SERIALIZE_NUMPY
+
+# Sessions are kept for the life of the process, so that connections (and their TLS handshakes) are re-used
+# between RPCs. Retry behaviour is fixed per adapter, so there is one session with retries and one without.
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+# The check_allow_transmit of the request being sent, which RPCRetry consults, as the sessions are shared
+_CHECK_ALLOW_TRANSMIT = contextvars.ContextVar('check_allow_transmit', default=None)
+# Fire and forget requests are sent from these threads
+FIRE_AND_FORGET_WORKERS = 8
+_FIRE_AND_FORGET_EXECUTOR = None
+# Hosts to keep connection pools for, and connections to keep open to each host
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 64
+# Connections the httpx transport keeps to each host. HTTP/2 runs many RPCs at once over each one
+HTTPX_MAX_CONNECTIONS = 8
+
+
+def _keepalive_socket_options():
+    """Socket options turning on TCP keepalive, with the probe timings set where the platform supports them.
+
+    Returns:
+        list: urllib3's default socket options, plus the keepalive ones
+    """
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # Probe after 30s idle, every 10s, giving up after 3 missed probes
+    for name, value in (('TCP_KEEPIDLE', 30), ('TCP_KEEPINTVL', 10), ('TCP_KEEPCNT', 3)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+KEEPALIVE_SOCKET_OPTIONS = _keepalive_socket_options()
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """An HTTPAdapter whose connections use TCP keepalive, so a pooled connection the server has dropped while
+    idle is noticed before it's reused, rather than costing the next RPC a failed send and a reconnect.
+    """
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault('socket_options', KEEPALIVE_SOCKET_OPTIONS)
+        super(KeepAliveAdapter, self).init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        proxy_kwargs.setdefault('socket_options', KEEPALIVE_SOCKET_OPTIONS)
+        return super(KeepAliveAdapter, self).proxy_manager_for(proxy, **proxy_kwargs)
+
+
+def _get_session(retry=True):
+    """Gets the pooled session for a retry behaviour, creating it on first use.
+
+    Args:
+        retry (bool, optional): Whether failed requests should be retried
+
+    Returns:
+        requests.Session: A session with the retry adapter mounted. It must not be closed by the caller.
+    """
+    session = _SESSIONS.get(retry)
+    if session is None:
+        with _SESSIONS_LOCK:
+            session = _SESSIONS.get(retry)
+            if session is None:
+                session = requests.sessions.Session()
+                # Shared by every SimpleRPC and token, so cookies from one's responses mustn't go out with another's
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = KeepAliveAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE,
+                    max_retries=RPCRetry() if retry else 0,
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _SESSIONS[retry] = session
+    return session
+
+
+def _get_fire_and_forget_executor():
+    """Gets the thread pool fire and forget requests are sent from, creating it on first use.
+
+    Returns:
+        concurrent.futures.ThreadPoolExecutor: The executor. It must not be shut down by the caller.
+    """
+    global _FIRE_AND_FORGET_EXECUTOR
+    if _FIRE_AND_FORGET_EXECUTOR is None:
+        with _SESSIONS_LOCK:
+            if _FIRE_AND_FORGET_EXECUTOR is None:
+                _FIRE_AND_FORGET_EXECUTOR = ThreadPoolExecutor(
+                    max_workers=FIRE_AND_FORGET_WORKERS, thread_name_prefix='plaid-rpc',
+                )
+    return _FIRE_AND_FORGET_EXECUTOR
+
+
+def _post(session, check_allow_transmit, *args, **kwargs):
+    """Posts with a shared session, with check_allow_transmit in effect for the request's retries.
+
+    Args:
+        session (requests.Session): The session to post with
+        check_allow_transmit (callable): For use in retry, callable method to see if retries are still valid to send
+        *args: Passed on to session.post
+        **kwargs: Passed on to session.post
+
+    Returns:
+        requests.Response: The response
+    """
+    token = _CHECK_ALLOW_TRANSMIT.set(check_allow_transmit)
+    try:
+        return session.post(*args, **kwargs)
+    finally:
+        _CHECK_ALLOW_TRANSMIT.reset(token)
+
+
+def _ensure_download_folder():
+    """Creates the download folder if needed. Done on each download, rather than at import, so the folder comes
+    back if the temp directory is cleaned out while the process is running.
+    """
+    os.makedirs(download_folder, exist_ok=True)
+
+
+def _build_headers(token=None, headers=None):
+    """Builds the headers for an RPC request, without changing the custom headers passed in.
+
+    Args:
+        token (str, optional): oauth2 token
+        headers (dict, optional): Custom headers to send with the RPC
 
-if not os.path.exists(download_folder):
-    os.makedirs(download_folder)
+    Returns:
+        dict: The headers to send
+    """
+    rpc_headers = {**headers} if headers else {}
+    rpc_headers["Content-Type"] = "application/json"
+    if token:
+        rpc_headers["Authorization"] = f"Bearer {token}"
+    return rpc_headers
+
+
+def _header_source(token=None, headers=None):
+    """Makes a function returning the headers for RPC requests, building them again only when the token changes.
+
+    Args:
+        token (str or callable): oauth2 token, or a function returning the current one
+        headers (dict, optional): Custom headers to send with each RPC
+
+    Returns:
+        callable: Takes no arguments and returns the headers dict, which must not be changed
+    """
+    if not callable(token):
+        static_headers = _build_headers(token, headers)
+        return lambda: static_headers
+
+    last = (None, None)
+
+    def get_headers():
+        nonlocal last
+        http_token = token()
+        last_token, last_headers = last
+        if last_headers is None or http_token != last_token:
+            last_headers = _build_headers(http_token, headers)
+            last = (http_token, last_headers)
+        return last_headers
+
+    return get_headers
+
+
+def _rpc_payload(json_data):
+    """Serializes a JSON-RPC request, giving it an id of 0 if it doesn't have one.
+
+    Args:
+        json_data (json-encodable object): the request, or a list of requests to send as a JSON-RPC batch
+
+    Returns:
+        bytes: The request body
+    """
+    if isinstance(json_data, list) or 'id' in json_data:
+        # A JSON-RPC batch, or a request that already carries its own id
+        rpc_data = json_data
+    else:
+        rpc_data = {**json_data, 'id': 0}
+    return json.dumps(rpc_data, default=unsupported_object_json_encoder, option=JSON_OPTIONS)
+
+
+def _proxy_for(uri, proxies):
+    """Picks the proxy for a uri from a requests style mapping of protocol (or protocol and hostname) to proxy.
+
+    Args:
+        uri (str): The uri being requested
+        proxies (dict): Dictionary mapping protocol or protocol and hostname to the URL of the proxy.
+
+    Returns:
+        str: The proxy URL, or None to connect directly
+    """
+    if not proxies:
+        return None
+    parsed = urlparse(uri)
+    return proxies.get(f'{parsed.scheme}://{parsed.hostname}') or proxies.get(parsed.scheme) or proxies.get('all')
 
 
 def http_json_rpc(token=None, uri=None, verify_ssl=None, json_data=None, proxies=None,
-                  fire_and_forget=False, check_allow_transmit=None, retry=True, headers=None):
+                  fire_and_forget=False, check_allow_transmit=None, retry=True, headers=None, prepared_headers=None):
     """
     Sends a json_rpc request over http.
 
@@ -50,109 +254,301 @@ def http_json_rpc(token=None, uri=None, verify_ssl=None, json_data=None, proxies
         token (str): oauth2 token
         uri (str): the server uri to connect to
         verify_ssl (bool): passed to requests. flag to check the server's certs, or not.
-        json_data (json-encodable object): the payload to send
+        json_data (json-encodable object): the payload to send, or a list of payloads to send as a JSON-RPC batch
         proxies (dict): Dictionary mapping protocol or protocol and hostname to the URL of the proxy.
         fire_and_forget (bool,optional): return from the method after the request is sent (not wait for response)
         check_allow_transmit (callable, optional): For use in retry, callable method to see if retries are still valid to send
         retry (bool, optional): Whether or not to use retry at all, default True
         headers (dict, optional): Custom headers to send with the RPC
+        prepared_headers (dict, optional): The complete headers to send, as built by _build_headers. Used as is,
+            in place of token and headers.
     """
-    def auth_header():
-        return "Bearer {}".format(token)
+    is_stream = isinstance(json_data, dict) and json_data.get('method') in STREAM_ENDPOINTS
+    headers = prepared_headers or _build_headers(token, headers)
+    payload = _rpc_payload(json_data)
+
+    session = _get_session(retry and not is_stream)
+    if is_stream:
+        _ensure_download_folder()
+        handle, file_name = tempfile.mkstemp(dir=download_folder, prefix="download_", suffix=".tmp")
+        # copyfileobj already moves whole chunks, so an extra buffer would only add a copy
+        with os.fdopen(handle, 'wb', buffering=0) as tmp_file:
+            with _post(session, check_allow_transmit, uri, headers=headers, data=payload, verify=verify_ssl,
+                       proxies=proxies, allow_redirects=False, stream=True) as response:
+                response.raise_for_status()
+                preallocated = _preallocate(tmp_file, response.headers)
+                response.raw.decode_content = True
+                shutil.copyfileobj(response.raw, tmp_file, length=DOWNLOAD_CHUNK_SIZE)
+                if preallocated:
+                    tmp_file.truncate()
+        return _finish_download(file_name)
+    elif fire_and_forget:
+        r_future = _get_fire_and_forget_executor().submit(
+            _post, session, check_allow_transmit, uri, headers=headers, data=payload, verify=verify_ssl,
+            proxies=proxies, allow_redirects=False,
+        )
+
+        # Adding a callback that will raise an exception if there was a problem with the request
+        r_future.add_done_callback(functools.partial(_on_request_complete, json_data))
+    else:
+        try:
+            response = _post(session, check_allow_transmit, uri, headers=headers, data=payload, verify=verify_ssl,
+                             proxies=proxies, allow_redirects=False)
+            response.raise_for_status()
+            result = json.loads(response.content)
+            return result
+        except Exception:
+            print(f'Exception for method {_method_names(json_data)}')
+            raise
+
+
+@functools.lru_cache(maxsize=8)
+def _get_httpx_client(verify_ssl, proxy):
+    """Gets the shared HTTP/2 client for a verify_ssl and proxy setting, creating it on first use.
+
+    Args:
+        verify_ssl (bool): flag to check the server's certs, or not.
+        proxy (str): The URL of the proxy to use, or None to connect directly
 
-    def streamable():
-        if json_data and json_data.get('method') in STREAM_ENDPOINTS:
-            return True
+    Returns:
+        httpx.Client: The client. It must not be closed by the caller.
+    """
+    # No timeout, as with the requests transport. Long running RPCs would otherwise fail after httpx's default 5s
+    return httpx.Client(
+        http2=True,
+        verify=verify_ssl,
+        proxy=proxy,
+        timeout=None,
+        limits=httpx.Limits(max_connections=HTTPX_MAX_CONNECTIONS, max_keepalive_connections=HTTPX_MAX_CONNECTIONS),
+    )
+
+
+def httpx_json_rpc(token=None, uri=None, verify_ssl=None, json_data=None, proxies=None, headers=None,
+                   prepared_headers=None):
+    """
+    Sends a json_rpc request over HTTP/2 with httpx, so concurrent RPCs from several threads share one connection.
+
+    Unlike http_json_rpc, failed requests are not retried, and there is no fire and forget.
+
+    Returns:
+        dict: The decoded response from the server, or the name of the downloaded file for streamed methods.
+    Args:
+        token (str): oauth2 token
+        uri (str): the server uri to connect to
+        verify_ssl (bool): flag to check the server's certs, or not.
+        json_data (json-encodable object): the payload to send, or a list of payloads to send as a JSON-RPC batch
+        proxies (dict): Dictionary mapping protocol or protocol and hostname to the URL of the proxy.
+        headers (dict, optional): Custom headers to send with the RPC
+        prepared_headers (dict, optional): The complete headers to send, as built by _build_headers. Used as is,
+            in place of token and headers.
+    """
+    if httpx is None:
+        raise ImportError('httpx is required for the httpx transport. Install plaidcloud-rpc[http2]')
+    is_stream = isinstance(json_data, dict) and json_data.get('method') in STREAM_ENDPOINTS
+    headers = prepared_headers or _build_headers(token, headers)
+    payload = _rpc_payload(json_data)
+
+    client = _get_httpx_client(bool(verify_ssl), _proxy_for(uri, proxies))
+    if is_stream:
+        _ensure_download_folder()
+        handle, file_name = tempfile.mkstemp(dir=download_folder, prefix="download_", suffix=".tmp")
+        with os.fdopen(handle, 'wb', buffering=0) as tmp_file:
+            with client.stream('POST', uri, headers=headers, content=payload) as response:
+                response.raise_for_status()
+                preallocated = _preallocate(tmp_file, response.headers)
+                for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    tmp_file.write(chunk)
+                if preallocated:
+                    tmp_file.truncate()
+        return _finish_download(file_name)
+    try:
+        response = client.post(uri, headers=headers, content=payload)
+        response.raise_for_status()
+        return json.loads(response.content)
+    except Exception:
+        print(f'Exception for method {_method_names(json_data)}')
+        raise
+
+
+def _on_request_complete(json_data, request_future):
+    """Done callback for fire and forget requests, raising any problem with the request."""
+    try:
+        response = request_future.result()
+        response.raise_for_status()
+    except:
+        print(f'Exception for method {_method_names(json_data)}')
+        raise
+
+
+def _json_response_from_file(file_name):
+    """Reads back a downloaded file as a JSON-RPC response, for when the server sent one (e.g. an error) in
+    place of the stream.
+
+    Args:
+        file_name (str): The downloaded file
+
+    Returns:
+        dict: The response, or None if the file holds streamed data
+    """
+    with open(file_name, 'rb') as downloaded:
+        if not downloaded.read(64).lstrip().startswith(b'{'):
+            return None
+        downloaded.seek(0)
+        try:
+            result = json.loads(downloaded.read())
+        except json.JSONDecodeError:
+            return None
+    if isinstance(result, dict):
+        return result
+    return None
+
+
+def _preallocate(tmp_file, response_headers):
+    """Reserves the disk space for a download up front when its size is known, so the file is laid out in as few
+    extents as possible. Compressed responses are skipped, as Content-Length is then the compressed size.
+
+    Args:
+        tmp_file (file): The file being downloaded to
+        response_headers (dict): The headers of the response
+
+    Returns:
+        bool: True if space was reserved, in which case the file must be truncated to what was written
+    """
+    if not hasattr(os, 'posix_fallocate') or response_headers.get('Content-Encoding', 'identity') != 'identity':
         return False
+    try:
+        length = int(response_headers.get('Content-Length', 0))
+        if length <= 0:
+            return False
+        os.posix_fallocate(tmp_file.fileno(), 0, length)
+    except (ValueError, OSError):
+        # Not a number, or the filesystem can't do it. Either way just download without
+        return False
+    return True
 
-    headers = headers or {}
-    headers["Content-Type"] = "application/json"
-    if token:
-        headers["Authorization"] = auth_header()
 
-    payload = json.dumps(assoc(json_data, 'id', 0), default=unsupported_object_json_encoder, option=json.OPT_NAIVE_UTC | json.OPT_NON_STR_KEYS)
+def _finish_download(file_name):
+    """Hands back a streamed download, or the JSON-RPC response the server sent in its place.
 
-    def get_session():
-        if fire_and_forget:
-            return FuturesSession()
-        return requests.sessions.Session()
+    Args:
+        file_name (str): The downloaded file
 
-    with get_session() as session:
-        if streamable() or not retry:
-            retry = 0
-        else:
-            retry = RPCRetry(check_allow_transmit=check_allow_transmit)
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount('http://', adapter)
-        session.mount('https://', adapter)
-
-        if streamable():
-            handle, file_name = tempfile.mkstemp(dir=download_folder, prefix="download_", suffix=".tmp")
-            os.close(handle)  # Can't control the access mode, so close this one and open another.
-            with open(file_name, 'wb') as tmp_file:
-                with session.post(uri, headers=headers, data=payload, verify=verify_ssl, proxies=proxies,
-                                  allow_redirects=False, stream=True) as response:
-                    response.raise_for_status()
-                    try:
-                        result = response.json()
-                        if isinstance(result, dict):
-                            return result
-                    except Exception:  # JSONDecodeError: Should be this, but which library? json or simplejson - depends what is installed
-                        pass
-                    for chunk in response.iter_content(chunk_size=None):
-                        tmp_file.write(chunk)
-            return file_name
-        elif fire_and_forget:
-            r_future = session.post(uri, headers=headers, data=payload, verify=verify_ssl, proxies=proxies,
-                                    allow_redirects=False)
-
-            # Adding a callback that will raise an exception if there was a problem with the request
-            def on_request_complete(request_future):
-                try:
-                    response = request_future.result()
-                    response.raise_for_status()
-                except:
-                    print(f'Exception for method {json_data.get("method")}')
-                    raise
-
-            r_future.add_done_callback(on_request_complete)
+    Returns:
+        The decoded response if there was one, in which case the file is removed. Otherwise the file name
+    """
+    result = _json_response_from_file(file_name)
+    if result is not None:
+        os.remove(file_name)
+        return result
+    return file_name
+
+
+def _method_names(json_data):
+    if isinstance(json_data, list):
+        return ', '.join(str(request.get('method')) for request in json_data)
+    return json_data.get('method')
+
+
+def _rpc_result(response):
+    """Unpacks the result of a JSON-RPC response, raising any error it holds.
+
+    Args:
+        response (dict or str): The decoded response, or the name of a downloaded file for streamed methods
+
+    Returns:
+        The result of the RPC
+    """
+    if response:
+        if isinstance(response, str):
+            return response
+        if response.get('ok'):
+            return response['result']
         else:
-            try:
-                response = session.post(uri, headers=headers, data=payload, verify=verify_ssl, proxies=proxies,
-                                        allow_redirects=False)
-                response.raise_for_status()
-                result = response.json()
-                return result
-            except Exception as e:
-                print(f'Exception for method {json_data.get("method")}')
-                raise
+            error = response['error']
+            if error.get('code') == WARNING_CODE:
+                raise Warning(error.get('message'))
+            else:
+                raise RPCError(
+                    error['message'],
+                    data=error.get('data'),
+                    code=error.get('code'),
+                )
+
+
+def _batch_requests(calls):
+    """Builds the requests of a JSON-RPC batch.
+
+    Args:
+        calls (list): (method_path, params) pairs
+
+    Returns:
+        list: The requests, with their position in the batch as their id
+    """
+    batch = [
+        {
+            'jsonrpc': '2.0',
+            'method': method_path,
+            'params': params,
+            'id': request_id,
+        }
+        for request_id, (method_path, params) in enumerate(calls)
+    ]
+    streamed = [request['method'] for request in batch if request['method'] in STREAM_ENDPOINTS]
+    if streamed:
+        raise ValueError(f'Streamed methods cannot be batched: {", ".join(streamed)}')
+    return batch
+
+
+def _batch_results(batch, responses):
+    """Matches the responses to a JSON-RPC batch back up with its requests.
+
+    Args:
+        batch (list): The requests sent
+        responses (list): The decoded responses, in any order
+
+    Returns:
+        tuple: The result of each request, in the order they were sent
+    """
+    if isinstance(responses, dict):
+        # The whole batch was rejected
+        _rpc_result(responses)
+        raise RPCError('Invalid response to batch request', data=responses)
+    by_id = {response.get('id'): response for response in responses}
+    missing = [request['method'] for request in batch if request['id'] not in by_id]
+    if missing:
+        raise RPCError(f'No response to batched methods: {", ".join(missing)}')
+    return tuple(_rpc_result(by_id[request['id']]) for request in batch)
 
 
 class RPCRetry(Retry):
+    # Applied to every instance, including the copies urllib3 makes with new() as a request is retried
+    RPC_RETRY_SETTINGS = {
+        'allowed_methods': frozenset({'POST'}),
+        'status_forcelist': frozenset({500, 502, 504}),
+        'backoff_factor': 0.1,
+    }
+
     def __init__(self, *args, check_allow_transmit=None, **kwargs):
         """
         Args:
             check_allow_transmit (callable, optional): Method to call to check if retries are still to be made
                 This can be used to prevent retry of RPC methods once a workflow has been cancelled and the RPC fails
         """
-        kwargs.update(dict(
-            allowed_methods=['POST'],
-            status_forcelist=[500, 502, 504],
-            backoff_factor=0.1,
-        ))
-        if 'connect' not in kwargs:
-            kwargs['connect'] = 5
+        kwargs.update(self.RPC_RETRY_SETTINGS)
+        kwargs.setdefault('connect', 5)
         super(RPCRetry, self).__init__(*args, **kwargs)
         self.__check_allow_transmit = check_allow_transmit
 
     def new(self, **kw):
-        kw.update(dict(check_allow_transmit=self.__check_allow_transmit))
+        kw['check_allow_transmit'] = self.__check_allow_transmit
         return super(RPCRetry, self).new(**kw)
 
     @property
     def allow_transmit(self):
-        if self.__check_allow_transmit:
-            return self.__check_allow_transmit()
+        # Retries on a shared session take the check of the request being sent
+        check_allow_transmit = self.__check_allow_transmit or _CHECK_ALLOW_TRANSMIT.get()
+        if check_allow_transmit:
+            return check_allow_transmit()
         return True
 
     def increment(self, *args, **kwargs):
@@ -170,49 +566,57 @@ class SimpleRPC(PlainRPCCommon):
     Example:
     rpc = SimpleRPC(token, uri=uri, verify_ssl=verify_ssl, workspace=workspace)
     scopes = rpc.identity.me.scopes()
+
+    Pass transport='httpx' to send RPCs over HTTP/2 with httpx, which lets
+    RPCs made concurrently from several threads share one connection. It
+    doesn't retry, and fire and forget calls still go through requests.
     """
     def __init__(self, token, uri=None, verify_ssl=None, workspace=None, proxies=None, check_allow_transmit=None,
-                 retry=True, headers=None):
+                 retry=True, headers=None, transport='requests'):
+        if transport not in ('requests', 'httpx'):
+            raise ValueError(f'Unknown transport {transport}, expected requests or httpx')
+        if transport == 'httpx' and httpx is None:
+            raise ImportError('httpx is required for the httpx transport. Install plaidcloud-rpc[http2]')
         verify_ssl = bool(verify_ssl)
         self.__rpc_uri = uri
         self.__verify_ssl = verify_ssl
         self.__auth_token = token
+        get_headers = _header_source(token, headers)
+        # Method paths are always relative, so joining them onto the uri is plain concatenation onto its directory
+        uri_base = urljoin(uri, '.') if uri else uri
+
+        def send(url, json_data, fire_and_forget=False):
+            if transport == 'httpx' and not fire_and_forget:
+                return httpx_json_rpc(None, url, verify_ssl, json_data, proxies=proxies, prepared_headers=get_headers())
+            return http_json_rpc(
+                None, url, verify_ssl, json_data,
+                proxies=proxies,
+                fire_and_forget=fire_and_forget,
+                check_allow_transmit=check_allow_transmit,
+                retry=retry,
+                prepared_headers=get_headers(),
+            )
 
         def call_rpc(method_path, params, fire_and_forget=False):
-            if callable(token):
-                http_token = token()
-            else:
-                http_token = token
-            response = http_json_rpc(
-                http_token, urljoin(uri, method_path), verify_ssl,
+            response = send(
+                uri_base + method_path,
                 {
                     'jsonrpc': '2.0',
                     'method': method_path,
                     'params': params,
+                    'id': 0,
                 },
-                proxies=proxies,
                 fire_and_forget=fire_and_forget,
-                check_allow_transmit=check_allow_transmit,
-                retry=retry,
-                headers=headers,
             )
-            if response:
-                if isinstance(response, str):
-                    return response
-                if response.get('ok'):
-                    return response['result']
-                else:
-                    error = response['error']
-                    if error.get('code') == WARNING_CODE:
-                        raise Warning(error.get('message'))
-                    else:
-                        raise RPCError(
-                            error['message'],
-                            data=error.get('data'),
-                            code=error.get('code'),
-                        )
-
-        super(SimpleRPC, self).__init__(call_rpc, check_allow_transmit)
+            return _rpc_result(response)
+
+        def call_rpc_batch(calls):
+            batch = _batch_requests(calls)
+            if not batch:
+                return ()
+            return _batch_results(batch, send(uri, batch))
+
+        super(SimpleRPC, self).__init__(call_rpc, check_allow_transmit, call_rpc_batch)
 
     @property
     def verify_ssl(self):
@@ -0,0 +1,201 @@
+# coding=utf-8
+"""Asynchronous JSON-RPC over http, so that many RPCs can be in flight at once on one event loop and one
+connection pool, rather than a thread per request."""
+
+import asyncio
+import logging
+from urllib.parse import urljoin
+
+import orjson as json
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from plaidcloud.rpc.connection.jsonrpc import (
+    STREAM_ENDPOINTS, _batch_requests, _batch_results, _build_headers, _header_source, _proxy_for, _rpc_payload,
+    _rpc_result,
+)
+from plaidcloud.rpc.remote.rpc_tools import PlainRPCCommon
+
+__author__ = 'Paul Morel'
+__credits__ = ['Paul Morel', 'Adams Tower']
+__maintainer__ = 'Adams Tower <adams.tower@tartansolutions.com>'
+__copyright__ = '© Copyright 2019-2023, Tartan Solutions, Inc'
+__license__ = 'Apache 2.0'
+
+logger = logging.getLogger(__name__)
+
+# Connections to keep open in the pool, and how long an idle one is kept, in seconds
+CONNECTION_LIMIT = 64
+KEEPALIVE_TIMEOUT = 30
+
+# Fire and forget tasks, referenced until they finish so they aren't garbage collected part way through
+_BACKGROUND_TASKS = set()
+
+
+def _new_session():
+    """Creates a pooled session on the running event loop.
+
+    It keeps no cookies, as its requests may be sent on behalf of different users, and sets no timeout, as with
+    SimpleRPC.
+
+    Returns:
+        aiohttp.ClientSession: The session. The caller is responsible for closing it.
+    """
+    if aiohttp is None:
+        raise ImportError('aiohttp is required for asynchronous RPC. Install plaidcloud-rpc[async]')
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=CONNECTION_LIMIT, keepalive_timeout=KEEPALIVE_TIMEOUT),
+        cookie_jar=aiohttp.DummyCookieJar(),
+        timeout=aiohttp.ClientTimeout(total=None),
+    )
+
+
+async def http_json_rpc_async(token=None, uri=None, verify_ssl=None, json_data=None, proxies=None, headers=None,
+                              prepared_headers=None, session=None):
+    """
+    Sends a json_rpc request over http, without blocking the event loop.
+
+    Unlike http_json_rpc, failed requests are not retried and streamed methods are not supported.
+
+    Returns:
+        dict: The decoded response from the server.
+    Args:
+        token (str): oauth2 token
+        uri (str): the server uri to connect to
+        verify_ssl (bool): flag to check the server's certs, or not.
+        json_data (json-encodable object): the payload to send, or a list of payloads to send as a JSON-RPC batch
+        proxies (dict): Dictionary mapping protocol or protocol and hostname to the URL of the proxy.
+        headers (dict, optional): Custom headers to send with the RPC
+        prepared_headers (dict, optional): The complete headers to send, as built by _build_headers. Used as is,
+            in place of token and headers.
+        session (aiohttp.ClientSession, optional): The session to send the request with, so its connections are
+            reused. Without one, a session is opened and closed for this request alone.
+    """
+    if session is None:
+        async with _new_session() as session:
+            return await http_json_rpc_async(
+                token, uri, verify_ssl, json_data, proxies, headers, prepared_headers, session=session,
+            )
+    if isinstance(json_data, dict) and json_data.get('method') in STREAM_ENDPOINTS:
+        raise ValueError(f'Streamed method {json_data["method"]} is not supported asynchronously, use SimpleRPC')
+    headers = prepared_headers or _build_headers(token, headers)
+    payload = _rpc_payload(json_data)
+
+    async with session.post(uri, data=payload, headers=headers, ssl=bool(verify_ssl),
+                            proxy=_proxy_for(uri, proxies), allow_redirects=False) as response:
+        response.raise_for_status()
+        return json.loads(await response.read())
+
+
+def _log_background_failure(method_path, task):
+    _BACKGROUND_TASKS.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error('Exception for method %s', method_path, exc_info=task.exception())
+
+
+class AsyncSimpleRPC(PlainRPCCommon):
+    """Call remote rpc methods with a dot based interface, almost as if they
+    were simply coroutines in modules.
+
+    Example:
+    rpc = AsyncSimpleRPC(token, uri=uri, verify_ssl=verify_ssl, workspace=workspace)
+    scopes = await rpc.identity.me.scopes()
+
+    Batches are awaited, and used with async with:
+    scopes, workspaces = await rpc.batch([rpc.identity.me.scopes, rpc.identity.me.workspaces])
+    async with rpc.batch():
+        scopes = rpc.identity.me.scopes()
+
+    Each instance pools its connections in a session of its own, on the
+    event loop it is first used on. Close it when done with await rpc.close(),
+    or by using the instance with async with:
+    async with AsyncSimpleRPC(token, uri=uri) as rpc:
+        scopes = await rpc.identity.me.scopes()
+    """
+    def __init__(self, token, uri=None, verify_ssl=None, workspace=None, proxies=None, check_allow_transmit=None,
+                 headers=None):
+        verify_ssl = bool(verify_ssl)
+        self.__rpc_uri = uri
+        self.__verify_ssl = verify_ssl
+        self.__auth_token = token
+        self.__session = None
+        get_headers = _header_source(token, headers)
+        # Method paths are always relative, so joining them onto the uri is plain concatenation onto its directory
+        uri_base = urljoin(uri, '.') if uri else uri
+
+        async def send_rpc(method_path, params):
+            response = await http_json_rpc_async(
+                None, uri_base + method_path, verify_ssl,
+                {
+                    'jsonrpc': '2.0',
+                    'method': method_path,
+                    'params': params,
+                    'id': 0,
+                },
+                proxies=proxies,
+                prepared_headers=get_headers(),
+                session=self._get_session(),
+            )
+            return _rpc_result(response)
+
+        def call_rpc(method_path, params, fire_and_forget=False):
+            if fire_and_forget:
+                task = asyncio.ensure_future(send_rpc(method_path, params))
+                _BACKGROUND_TASKS.add(task)
+                task.add_done_callback(lambda done: _log_background_failure(method_path, done))
+                # Still hand back something awaitable, so callers can await every call the same way
+                return asyncio.sleep(0)
+            return send_rpc(method_path, params)
+
+        async def call_rpc_batch(calls):
+            batch = _batch_requests(calls)
+            if not batch:
+                return ()
+            responses = await http_json_rpc_async(
+                None, uri, verify_ssl, batch,
+                proxies=proxies,
+                prepared_headers=get_headers(),
+                session=self._get_session(),
+            )
+            return _batch_results(batch, responses)
+
+        super(AsyncSimpleRPC, self).__init__(call_rpc, check_allow_transmit, call_rpc_batch)
+
+    def _get_session(self):
+        """Gets this instance's session, creating it on first use or after it was closed.
+
+        Returns:
+            aiohttp.ClientSession: The session. It must not be closed by the caller, use close instead.
+        """
+        if self.__session is None or self.__session.closed:
+            self.__session = _new_session()
+        return self.__session
+
+    async def close(self):
+        """Closes this instance's session, if it has one. Call before its event loop is closed."""
+        session, self.__session = self.__session, None
+        if session is not None:
+            await session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def verify_ssl(self):
+        return self.__verify_ssl
+
+    @property
+    def rpc_uri(self):
+        return self.__rpc_uri
+
+    @property
+    def auth_token(self):
+        if callable(self.__auth_token):
+            return self.__auth_token()
+        return self.__auth_token
@@ -1,12 +1,15 @@
 #!/usr/bin/env python
 # coding=utf-8
 
+import base64
+import functools
+import time
 from typing import Union
+from urllib.parse import urlencode
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-import jwt
-from datetime import datetime
+import orjson as json
 
 __author__ = 'Paul Morel'
 __copyright__ = 'Copyright 2010-2024, Tartan Solutions, Inc'
@@ -16,22 +19,72 @@ __maintainer__ = 'Paul Morel'
 __email__ = 'paul.morel@tartansolutions.com'
 
 
+@functools.lru_cache(maxsize=None)
+def _get_session(retry: bool) -> requests.Session:
+    """Gets the session shared by token requests, so refreshing a token re-uses the connection to the auth server.
+
+    Args:
+        retry (bool): Whether to retry requests
+
+    Returns:
+        requests.Session: The session. It must not be closed by the caller."""
+    session = requests.Session()
+    adapter = HTTPAdapter(max_retries=Retry() if retry else 0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _decode(response: requests.Response) -> dict:
+    """Decodes a JSON response body straight from its bytes.
+
+    Args:
+        response (requests.Response): The response to decode
+
+    Returns:
+        dict: The decoded body"""
+    return json.loads(response.content)
+
+
+def _form_body(payload: dict) -> bytes:
+    """Form encodes a request body, leaving out fields set to None as requests does for a dict body.
+
+    Args:
+        payload (dict): The fields to send
+
+    Returns:
+        bytes: The encoded body"""
+    return urlencode({k: v for k, v in payload.items() if v is not None}, doseq=True).encode('ascii')
+
+
 def token_is_expired(token: str) -> bool:
     """Checks to see if a JWT is expired. Expects the exp field
     in the JWT body.
-    
+
+    The signature is not verified, only the claims are read.
+
     Args:
         token (str): The encoded JWT to check
-        
+
     Returns:
         bool: True if the token is expired, else False"""
-    decoded = jwt.decode(token, options={"verify_signature": False})
-    if "exp" in decoded:
-        expires = decoded["exp"]
-        if datetime.now() >= datetime.fromtimestamp(expires):
-            return True
-    else:
-        return False
+    expires = _token_expiry(token)
+    return expires is not None and time.time() >= expires
+
+
+@functools.lru_cache(maxsize=128)
+def _token_expiry(token: str) -> Union[int, float, None]:
+    """Reads the exp claim of a JWT. Cached, as the same token tends to be checked over and over until it's replaced.
+
+    Args:
+        token (str): The encoded JWT
+
+    Returns:
+        The expiry as a unix timestamp, or None if the token has no exp"""
+    _, payload, _ = token.split('.', 2)
+    # base64url drops the padding, which the decoder needs back
+    claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    return claims.get("exp")
 
 
 def refresh_token(grant_type: str, client_id: str, refresh_token: str, uri: str = "https://auth.plaidcloud.com/",
@@ -67,19 +120,12 @@ def refresh_token(grant_type: str, client_id: str, refresh_token: str, uri: str
 
     uri = uri.rstrip('/')
     token_url = f"{uri}/realms/{realm}/protocol/openid-connect/token"
-    with requests.Session() as session:
-        if not retry:
-            retry = 0
-        else:
-            retry = Retry()
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount('http://', adapter)
-        session.mount('https://', adapter)
-        response = session.post(
-            token_url, headers=headers, json=payload, proxies=proxy_settings, verify=verify, timeout=(5,5),
-        )
-        response.raise_for_status()
-        return response.json()
+    response = _get_session(bool(retry)).post(
+        token_url, headers=headers, data=_form_body(payload), proxies=proxy_settings, verify=verify,
+        timeout=(5,5),
+    )
+    response.raise_for_status()
+    return _decode(response)
 
 
 def create_oauth_token(grant_type, client_id, client_secret, scopes='openid', username=None, password=None,
@@ -139,21 +185,13 @@ def create_oauth_token(grant_type, client_id, client_secret, scopes='openid', us
             "password": password,
         }
 
-    with requests.Session() as session:
-        if not retry:
-            retry = 0
-        else:
-            retry = Retry()
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount('http://', adapter)
-        session.mount('https://', adapter)
-
-        response = session.post(
-            token_url, headers=headers, data=payload, proxies=proxy_settings, verify=verify, timeout=(5, 5),
-        )
-        response.raise_for_status()
-        token = response.json()
-        return token
+    response = _get_session(bool(retry)).post(
+        token_url, headers=headers, data=_form_body(payload), proxies=proxy_settings, verify=verify,
+        timeout=(5, 5),
+    )
+    response.raise_for_status()
+    token = _decode(response)
+    return token
 
 
 
@@ -6,7 +6,6 @@ Useful functions for working with files.
 
 import os
 import ctypes
-import errno
 
 __author__ = 'Paul Morel'
 __copyright__ = 'Copyright 2010-2023, Tartan Solutions, Inc'
@@ -22,15 +21,7 @@ def makedirs(path):
     Args:
         path (str): The path to create
     """
-    try:
-        os.makedirs(path)
-    except OSError as e:
-        if e.errno == errno.EEXIST:
-            # Ignore "file already exists" errors
-            pass
-        else:
-            # But not other OSErrors
-            raise
+    os.makedirs(path, exist_ok=True)
 
 
 def set_windows_hidden(path):
@@ -106,7 +106,7 @@ async def execute_json_rpc(msg, auth_id, version=1, base_path=BASE_MODULE_PATH,
     Required message attributes include id and method.  The params argument is optional.
 
     Args:
-        msg (str or dict): JSON or JSON string containing the properly formatted JSON-RPC request
+        msg (str, dict or list): JSON or JSON string containing the properly formatted JSON-RPC request, or a batch of them
         auth_id (dict): Authentication Information and Identity
         version (int): API version to use for RPC
         base_path (str): Path to the root of the RPC methods
@@ -119,8 +119,9 @@ async def execute_json_rpc(msg, auth_id, version=1, base_path=BASE_MODULE_PATH,
           - ok (bool): The processing state result
           - result: Result of the request
           - error (dict): Error information including code, message, and data
+        For a batch, a list of those responses. Streamed methods are not streamed in a batch.
     """
-    if isinstance(msg, dict):
+    if isinstance(msg, (dict, list)):
         rpc_args = msg
     else:
         try:
@@ -137,13 +138,36 @@ async def execute_json_rpc(msg, auth_id, version=1, base_path=BASE_MODULE_PATH,
                 }
             }
 
+    if isinstance(rpc_args, list) and rpc_args:
+        # A batch. Run the requests in order, and leave out the responses to one-way messages
+        responses = []
+        for batch_args in rpc_args:
+            if not isinstance(batch_args, dict):
+                # Only the top level array is a batch, anything else in it is an invalid request
+                responses.append({
+                    'id': None,
+                    'ok': False,
+                    'error': {
+                        'code': -32600,
+                        'message': 'Invalid request object format. Each request in a batch must be a JSON map.',
+                        'data': None
+                    }
+                })
+                continue
+            response = await execute_json_rpc(
+                batch_args, auth_id, version=version, base_path=base_path, logger=logger, extra_params=extra_params
+            )
+            if response is not None:
+                responses.append(response)
+        return responses or None
+
     if not isinstance(rpc_args, dict):
         return {
             'id': None,
             'ok': False,
             'error': {
                 'code': -32600,
-                'message': 'Invalid request object format. Must be JSON map. Multiple operations are not supported.',
+                'message': 'Invalid request object format. Must be JSON map, or a non-empty list of them for a batch.',
                 'data': None
             }
         }
@@ -2,6 +2,7 @@
 # coding=utf-8
 
 import asyncio
+import contextvars
 import os
 import types
 import tempfile
@@ -14,6 +15,11 @@ __maintainer__ = 'Paul Morel <paul.morel@tartansolutions.com>'
 __copyright__ = '© Copyright 2018-2021, Tartan Solutions, Inc'
 __license__ = 'Apache 2.0'
 
+DOWNLOAD_BUFFER_SIZE = 1 << 20
+# The innermost Batch collecting calls on the current thread or task, of any rpc object. A context variable, rather
+# than a thread local, so concurrent tasks on one event loop batch separately
+_ACTIVE_BATCHES = contextvars.ContextVar('active_batch', default=None)
+
 
 def _create_rpc_args(method, params):
     return {
@@ -47,7 +53,7 @@ def direct_rpc(auth_id, method, params, logger=None):
             download_folder = os.path.join(tempfile.gettempdir(), "plaid/download")
             handle, file_name = tempfile.mkstemp(dir=download_folder, prefix="download_", suffix=".tmp")
             os.close(handle)  # Can't control the access mode, so close this one and open another.
-            with open(file_name, 'wb', buffering=1) as tmp_file:
+            with open(file_name, 'wb', buffering=DOWNLOAD_BUFFER_SIZE) as tmp_file:
                 for chunk in result:
                     tmp_file.write(chunk)
             return file_name
@@ -77,7 +83,7 @@ async def direct_rpc_async(auth_id, method, params, logger=None):
             download_folder = os.path.join(tempfile.gettempdir(), "plaid/download")
             handle, file_name = tempfile.mkstemp(dir=download_folder, prefix="download_", suffix=".tmp")
             os.close(handle)  # Can't control the access mode, so close this one and open another.
-            with open(file_name, 'wb', buffering=1) as tmp_file:
+            with open(file_name, 'wb', buffering=DOWNLOAD_BUFFER_SIZE) as tmp_file:
                 for chunk in result:
                     tmp_file.write(chunk)
             return file_name
@@ -93,25 +99,174 @@ class PlainRPCCommon(object):
     """
     call_rpc = None
 
-    def __init__(self, call_rpc, check_allow_transmit=None):
+    def __init__(self, call_rpc, check_allow_transmit=None, call_rpc_batch=None):
         """You will override this in subclasses. Your constructor must create a
         self.call_rpc member, containing a function that accepts method and
         params, makes an rpc call, and returns the result or raises an error.
         Usually you'll be closing over connection information provided to your
         constructor. See DirectRPC and SimpleRPC for examples.
+
+        Subclasses that can send several calls at once may also pass
+        call_rpc_batch, a function that accepts a list of (method, params)
+        pairs and returns a tuple of their results, in the same order.
         """
         self.__check_allow_transmit = check_allow_transmit
         self.call_rpc = call_rpc
+        self.call_rpc_batch = call_rpc_batch
 
     def __getattr__(self, key):
         return Namespace(self, self.call_rpc, [key])
 
+    def batch(self, calls=None):
+        """Makes several rpc calls at once, in a single round trip where the
+        transport supports it.
+
+        Example:
+        scopes, workspaces = rpc.batch([
+            rpc.identity.me.scopes,
+            (rpc.identity.me.workspaces, {'include_inactive': False}),
+        ])
+
+        Called without calls, returns a Batch to use as a context manager
+        instead, which collects the calls made inside the with block:
+        with rpc.batch():
+            scopes = rpc.identity.me.scopes()
+            workspaces = rpc.identity.me.workspaces(include_inactive=False)
+        print(scopes.result(), workspaces.result())
+
+        When call_rpc_batch is a coroutine function, as for AsyncSimpleRPC,
+        the result must be awaited, and the Batch used with async with.
+
+        Args:
+            calls (list, optional): Each item is an rpc method, or a (method, params) tuple.
+                Methods may also be given as a method path string, e.g. 'identity/me/scopes'
+
+        Returns:
+            tuple: The result of each call, in the order given. Or a Batch, if no calls were given
+        """
+        if calls is None:
+            return Batch(self)
+        if not self.allow_transmit:
+            if self.is_async_batch:
+                # Still hand back something awaitable, so callers can await every batch the same way
+                return asyncio.sleep(0)
+            return
+        method_calls = []
+        for call in calls:
+            if isinstance(call, tuple):
+                method, params = call
+            else:
+                method, params = call, {}
+            method_calls.append((getattr(method, 'method_path', method), params or {}))
+        if self.call_rpc_batch:
+            return self.call_rpc_batch(method_calls)
+        return tuple(self.call_rpc(method_path, params) for method_path, params in method_calls)
+
+    @property
+    def is_async_batch(self):
+        """Whether batch calls return a coroutine, and so the Batch must be used with async with"""
+        return asyncio.iscoroutinefunction(self.call_rpc_batch)
+
     @property
     def allow_transmit(self):
         if self.__check_allow_transmit:
             return self.__check_allow_transmit()
         return True
 
+    @property
+    def active_batch(self):
+        """The Batch collecting this thread's or task's calls, or None if they are sent straight away"""
+        return Batch.active_for(self)
+
+
+class BatchResult(object):
+    """The result of an rpc call made inside a Batch, available once the batch
+    has been sent.
+    """
+    __slots__ = ('_sent', '_value')
+
+    def __init__(self):
+        self._sent = False
+        self._value = None
+
+    def result(self):
+        if not self._sent:
+            raise RuntimeError('The batch holding this call has not been sent')
+        return self._value
+
+
+class Batch(object):
+    """Collects the rpc calls made in a with block on the current thread or
+    task, and sends them together when the block ends. See PlainRPCCommon.batch
+
+    Batches of an asynchronous rpc object, such as AsyncSimpleRPC, must be
+    used with async with instead.
+
+    If the batch fails, the error is raised from the end of the with block,
+    and none of its results are available.
+    """
+    def __init__(self, rpc_object):
+        self.__rpc_object = rpc_object
+        self.__calls = []
+        self.__results = []
+        self.__outer_batch = None
+        self.__token = None
+
+    @staticmethod
+    def active_for(rpc_object):
+        """The innermost Batch of an rpc object active on the current thread or task, or None"""
+        batch = _ACTIVE_BATCHES.get()
+        while batch is not None and batch.__rpc_object is not rpc_object:
+            batch = batch.__outer_batch
+        return batch
+
+    def add(self, method_path, params):
+        result = BatchResult()
+        self.__calls.append((method_path, params))
+        self.__results.append(result)
+        return result
+
+    def _start(self):
+        # Batches of other rpc objects may be active too, so they are chained rather than replaced
+        self.__outer_batch = _ACTIVE_BATCHES.get()
+        self.__token = _ACTIVE_BATCHES.set(self)
+        return self
+
+    def _stop(self, exc_type):
+        """Stops collecting calls, returning whether there are any to send"""
+        _ACTIVE_BATCHES.reset(self.__token)
+        self.__outer_batch = self.__token = None
+        return exc_type is None and bool(self.__calls)
+
+    def _set_results(self, values):
+        if values is None:
+            # Transmitting isn't allowed, so nothing was sent
+            return
+        for result, value in zip(self.__results, values):
+            result._value = value
+            result._sent = True
+
+    def __enter__(self):
+        if self.__rpc_object.is_async_batch:
+            raise TypeError('Batches of asynchronous rpc calls must be used with async with')
+        return self._start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._stop(exc_type):
+            self._set_results(self.__rpc_object.batch(self.__calls))
+        return False
+
+    async def __aenter__(self):
+        return self._start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if self._stop(exc_type):
+            values = self.__rpc_object.batch(self.__calls)
+            if asyncio.iscoroutine(values):
+                values = await values
+            self._set_results(values)
+        return False
+
 
 class Namespace(object):
     __rpc_object = None
@@ -147,8 +302,12 @@ class Object(object):
         def callable_method(fire_and_forget=False, **params):
             if not self.namespace.rpc.allow_transmit:
                 return
+            active_batch = self.namespace.rpc.active_batch
+            if active_batch is not None:
+                return active_batch.add(method_path, params)
             return self.call_rpc(method_path, params, fire_and_forget=fire_and_forget)
 
+        callable_method.method_path = method_path
         return callable_method
 
     @property
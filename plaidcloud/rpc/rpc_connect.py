@@ -5,14 +5,14 @@
    Gracefully handles oauth token generation."""
 
 from urllib.parse import urlencode
-import yaml
 import requests
 import uuid
+import orjson as json
 from concurrent.futures import ThreadPoolExecutor
 
 from plaidcloud.rpc.connection.jsonrpc import SimpleRPC
 from plaidcloud.rpc.remote import listener
-from plaidcloud.rpc.config import PlaidConfig, PlaidXLConfig
+from plaidcloud.rpc.config import PlaidConfig, PlaidXLConfig, write_plaid_conf
 
 __author__ = 'Charlie Laymon'
 __maintainer__ = 'Charlie Laymon <charlie.laymon@tartansolutions.com>'
@@ -107,12 +107,11 @@ class Connect(PlaidConfig, SimpleRPC):
         if result.status_code != requests.codes.get('ok'):
             raise Exception('Error requesting oauth token from PlaidCloud. Reason: {} ({})'.format(result.reason, result.text))
 
-        self.auth_token = result.json()['access_token']
+        self.auth_token = json.loads(result.content)['access_token']
 
         # Save token to the config
         self.config['auth_token'] = self.auth_token
-        with open(self.cfg_path, 'w') as config_file:
-            config_file.write(yaml.safe_dump(self.config))
+        write_plaid_conf(self.cfg_path, self.config)
 
     def get_auth_token(self):
         post_data = {
@@ -124,7 +123,7 @@ class Connect(PlaidConfig, SimpleRPC):
         if result.status_code != requests.codes.get('ok'):
             raise Exception('Error requesting oauth token from PlaidCloud. Reason: {} ({})'.format(result.reason, result.text))
 
-        return result.json()['access_token']
+        return json.loads(result.content)['access_token']
 
     def initialize(self):
         """Connects to PlaidCloud. If need be, this also sends the user to PlaidCloud to request a token"""
@@ -0,0 +1,127 @@
+# coding=utf-8
+
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import orjson as json
+
+from plaidcloud.rpc.connection.jsonrpc import (
+    RPCRetry, SimpleRPC, _CHECK_ALLOW_TRANSMIT, _get_httpx_client, _get_session, http_json_rpc,
+)
+
+__author__ = "Paul Morel"
+__copyright__ = "© Copyright 2010-2024, Tartan Solutions, Inc"
+__credits__ = ["Paul Morel"]
+__license__ = "Apache 2.0"
+__maintainer__ = "Paul Morel"
+__email__ = "paul.morel@tartansolutions.com"
+
+
+class _RPCHandler(BaseHTTPRequestHandler):
+    """Answers each JSON-RPC request with its method name, after the server's delay, and sets a cookie"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.received.append((self.path, dict(self.headers), body))
+        time.sleep(self.server.delay)
+        request = json.loads(body)
+        if isinstance(request, list):
+            result = [{'id': item['id'], 'ok': True, 'result': item['method']} for item in request]
+        else:
+            result = {'id': request['id'], 'ok': True, 'result': request['method']}
+        response = json.dumps(result)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.send_header('Set-Cookie', 'session=secret; Path=/')
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+class RPCServerTestCase(unittest.TestCase):
+    """Runs a local JSON-RPC server for the tests of a class"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _RPCHandler)
+        cls.server.received = []
+        cls.server.delay = 0
+        cls.uri = f'http://127.0.0.1:{cls.server.server_port}/json-rpc/'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.received.clear()
+        self.server.delay = 0
+
+
+class TestSharedSessions(RPCServerTestCase):
+    """These tests validate the sessions shared between RPCs"""
+
+    def test_one_session_per_retry_behaviour(self):
+        self.assertIs(_get_session(True), _get_session(True))
+        self.assertIsNot(_get_session(True), _get_session(False))
+
+    def test_cookies_are_not_kept(self):
+        for token in ('first', 'second'):
+            http_json_rpc(token, self.uri, False, {'method': 'identity/me/scopes', 'params': {}})
+        self.assertEqual(len(self.server.received), 2)
+        self.assertNotIn('Cookie', self.server.received[1][1])
+        self.assertEqual(len(_get_session(True).cookies), 0)
+
+    def test_fire_and_forget(self):
+        self.assertIsNone(
+            http_json_rpc('token', self.uri, False, {'method': 'identity/me/scopes', 'params': {}}, fire_and_forget=True)
+        )
+        deadline = time.monotonic() + 5
+        while not self.server.received and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.server.received), 1)
+
+    def test_retries_check_the_request_being_sent(self):
+        self.assertTrue(RPCRetry().allow_transmit)
+        token = _CHECK_ALLOW_TRANSMIT.set(lambda: False)
+        try:
+            self.assertFalse(RPCRetry().allow_transmit)
+            self.assertFalse(RPCRetry().new().allow_transmit)
+        finally:
+            _CHECK_ALLOW_TRANSMIT.reset(token)
+
+    def test_simple_rpc(self):
+        rpc = SimpleRPC('token', uri=self.uri)
+        self.assertEqual(rpc.identity.me.scopes(), 'identity/me/scopes')
+        path, headers, _ = self.server.received[0]
+        self.assertEqual(path, '/json-rpc/identity/me/scopes')
+        self.assertEqual(headers['Authorization'], 'Bearer token')
+
+
+class TestHttpxTransport(RPCServerTestCase):
+    """These tests validate sending RPCs with the httpx transport"""
+
+    def test_simple_rpc(self):
+        self.server.delay = 0.2
+        rpc = SimpleRPC('token', uri=self.uri, transport='httpx')
+        self.assertEqual(rpc.identity.me.scopes(), 'identity/me/scopes')
+        path, headers, _ = self.server.received[0]
+        self.assertEqual(path, '/json-rpc/identity/me/scopes')
+        self.assertEqual(headers['Authorization'], 'Bearer token')
+
+    def test_client_does_not_time_out(self):
+        timeout = _get_httpx_client(False, None).timeout
+        self.assertIsNone(timeout.connect)
+        self.assertIsNone(timeout.read)
+        self.assertIsNone(timeout.write)
+        self.assertIsNone(timeout.pool)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# coding=utf-8
+
+import asyncio
+import unittest
+from unittest import mock
+
+from plaidcloud.rpc.connection.jsonrpc_async import AsyncSimpleRPC, _new_session, http_json_rpc_async
+from plaidcloud.rpc.tests.connection.test_jsonrpc import RPCServerTestCase
+
+__author__ = "Paul Morel"
+__copyright__ = "© Copyright 2010-2024, Tartan Solutions, Inc"
+__credits__ = ["Paul Morel"]
+__license__ = "Apache 2.0"
+__maintainer__ = "Paul Morel"
+__email__ = "paul.morel@tartansolutions.com"
+
+
+class TestAsyncSimpleRPC(RPCServerTestCase):
+    """These tests validate sending RPCs asynchronously, and the sessions they are sent with"""
+
+    def test_simple_rpc(self):
+        async def run():
+            async with AsyncSimpleRPC('token', uri=self.uri) as rpc:
+                return await rpc.identity.me.scopes()
+
+        self.assertEqual(asyncio.run(run()), 'identity/me/scopes')
+        path, headers, _ = self.server.received[0]
+        self.assertEqual(path, '/json-rpc/identity/me/scopes')
+        self.assertEqual(headers['Authorization'], 'Bearer token')
+
+    def test_session_is_reused_then_closed(self):
+        async def run():
+            rpc = AsyncSimpleRPC('token', uri=self.uri)
+            await rpc.identity.me.scopes()
+            session = rpc._get_session()
+            await rpc.identity.me.workspaces()
+            self.assertIs(rpc._get_session(), session)
+            await rpc.close()
+            return session
+
+        self.assertTrue(asyncio.run(run()).closed)
+
+    def test_instance_can_be_used_again_after_closing(self):
+        rpc = AsyncSimpleRPC('token', uri=self.uri)
+
+        async def run():
+            async with rpc:
+                return await rpc.identity.me.scopes()
+
+        self.assertEqual(asyncio.run(run()), 'identity/me/scopes')
+        self.assertEqual(asyncio.run(run()), 'identity/me/scopes')
+
+    def test_cookies_are_not_kept(self):
+        async def run():
+            async with AsyncSimpleRPC('token', uri=self.uri) as rpc:
+                await rpc.identity.me.scopes()
+                await rpc.identity.me.scopes()
+
+        asyncio.run(run())
+        self.assertEqual(len(self.server.received), 2)
+        self.assertNotIn('Cookie', self.server.received[1][1])
+
+    def test_batch(self):
+        async def run():
+            async with AsyncSimpleRPC('token', uri=self.uri) as rpc:
+                async with rpc.batch():
+                    scopes = rpc.identity.me.scopes()
+                    workspaces = rpc.identity.me.workspaces()
+                return scopes.result(), workspaces.result()
+
+        self.assertEqual(asyncio.run(run()), ('identity/me/scopes', 'identity/me/workspaces'))
+        self.assertEqual(len(self.server.received), 1)
+
+    def test_request_without_a_session(self):
+        response = asyncio.run(
+            http_json_rpc_async('token', self.uri, False, {'method': 'identity/me/scopes', 'params': {}})
+        )
+        self.assertEqual(response['result'], 'identity/me/scopes')
+
+
+class TestSessionOptions(unittest.TestCase):
+    """These tests validate the options requests are sent with"""
+
+    def test_session_does_not_time_out(self):
+        async def run():
+            async with _new_session() as session:
+                return session.timeout
+
+        self.assertIsNone(asyncio.run(run()).total)
+
+    def test_ssl_verification(self):
+        response = mock.MagicMock()
+        response.read = mock.AsyncMock(return_value=b'{"id": 0, "ok": true, "result": null}')
+        session = mock.MagicMock()
+        session.post.return_value.__aenter__.return_value = response
+        for verify_ssl, ssl in ((True, True), (False, False), (None, False)):
+            asyncio.run(http_json_rpc_async(
+                'token', 'https://localhost/json-rpc/', verify_ssl, {'method': 'identity/me/scopes', 'params': {}},
+                session=session,
+            ))
+            self.assertIs(session.post.call_args.kwargs['ssl'], ssl)
+
+
+if __name__ == '__main__':
+    unittest.main()
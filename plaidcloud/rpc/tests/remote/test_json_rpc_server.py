@@ -0,0 +1,41 @@
+# coding=utf-8
+
+import asyncio
+import unittest
+
+from plaidcloud.rpc.remote.json_rpc_server import execute_json_rpc
+
+__author__ = "Paul Morel"
+__copyright__ = "© Copyright 2017-2021, Tartan Solutions, Inc"
+__credits__ = ["Paul Morel"]
+__license__ = "Apache 2.0"
+__maintainer__ = "Paul Morel"
+__email__ = "paul.morel@tartansolutions.com"
+
+
+class TestBatchRequests(unittest.TestCase):
+
+    """These tests validate handling JSON-RPC batch requests"""
+
+    def execute(self, msg):
+        return asyncio.run(execute_json_rpc(msg, {}))
+
+    def test_nested_batch_is_an_invalid_request(self):
+        responses = self.execute([[{'jsonrpc': '2.0', 'id': 1, 'method': 'a/b'}], 5])
+        self.assertEqual(len(responses), 2)
+        for response in responses:
+            self.assertIsNone(response['id'])
+            self.assertEqual(response['error']['code'], -32600)
+
+    def test_each_request_in_a_batch_gets_a_response(self):
+        responses = self.execute('[{"jsonrpc": "1.0", "id": 1, "method": "a/b"}, "x", {"jsonrpc": "2.0", "id": 2}]')
+        self.assertEqual([response['id'] for response in responses], [1, None, 2])
+        self.assertTrue(all(response['error']['code'] == -32600 for response in responses))
+
+    def test_empty_batch_is_an_invalid_request(self):
+        response = self.execute([])
+        self.assertEqual(response['error']['code'], -32600)
+
+
+if __name__ == '__main__':
+    unittest.main()
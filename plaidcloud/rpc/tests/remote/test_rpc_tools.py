@@ -0,0 +1,198 @@
+# coding=utf-8
+
+import asyncio
+import contextvars
+import gc
+import unittest
+import weakref
+import pytest
+
+from plaidcloud.rpc.remote.rpc_tools import PlainRPCCommon
+
+__author__ = "Paul Morel"
+__copyright__ = "© Copyright 2017-2021, Tartan Solutions, Inc"
+__credits__ = ["Paul Morel"]
+__license__ = "Apache 2.0"
+__maintainer__ = "Paul Morel"
+__email__ = "paul.morel@tartansolutions.com"
+
+
+class TestBatch(unittest.TestCase):
+
+    """These tests validate batching calls through the dot based rpc interface"""
+
+    def setUp(self):
+        self.calls = []
+
+        def call_rpc(method_path, params, fire_and_forget=False):
+            self.calls.append((method_path, params))
+            return method_path
+
+        self.call_rpc = call_rpc
+
+    def test_batch_without_batch_support_calls_in_order(self):
+        rpc = PlainRPCCommon(self.call_rpc)
+        results = rpc.batch([
+            rpc.identity.me.scopes,
+            (rpc.identity.me.workspaces, {'active': True}),
+            'analyze/project/projects',
+        ])
+        self.assertEqual(('identity/me/scopes', 'identity/me/workspaces', 'analyze/project/projects'), results)
+        self.assertEqual([
+            ('identity/me/scopes', {}),
+            ('identity/me/workspaces', {'active': True}),
+            ('analyze/project/projects', {}),
+        ], self.calls)
+
+    def test_batch_uses_batch_support_once(self):
+        batches = []
+
+        def call_rpc_batch(calls):
+            batches.append(calls)
+            return tuple(method_path for method_path, _ in calls)
+
+        rpc = PlainRPCCommon(self.call_rpc, call_rpc_batch=call_rpc_batch)
+        results = rpc.batch([rpc.identity.me.scopes, (rpc.identity.me.workspaces, None)])
+        self.assertEqual(('identity/me/scopes', 'identity/me/workspaces'), results)
+        self.assertEqual([[('identity/me/scopes', {}), ('identity/me/workspaces', {})]], batches)
+        self.assertEqual([], self.calls)
+
+    def test_batch_is_skipped_when_transmit_not_allowed(self):
+        rpc = PlainRPCCommon(self.call_rpc, check_allow_transmit=lambda: False)
+        self.assertIsNone(rpc.batch([rpc.identity.me.scopes]))
+        self.assertEqual([], self.calls)
+
+
+    def test_batch_context_collects_calls(self):
+        batches = []
+
+        def call_rpc_batch(calls):
+            batches.append(calls)
+            return tuple(method_path for method_path, _ in calls)
+
+        rpc = PlainRPCCommon(self.call_rpc, call_rpc_batch=call_rpc_batch)
+        with rpc.batch():
+            scopes = rpc.identity.me.scopes()
+            workspaces = rpc.identity.me.workspaces(active=True)
+            with pytest.raises(RuntimeError):
+                scopes.result()
+        self.assertEqual('identity/me/scopes', scopes.result())
+        self.assertEqual('identity/me/workspaces', workspaces.result())
+        self.assertEqual([[('identity/me/scopes', {}), ('identity/me/workspaces', {'active': True})]], batches)
+        self.assertEqual([], self.calls)
+
+    def test_calls_after_batch_context_are_sent_directly(self):
+        rpc = PlainRPCCommon(self.call_rpc)
+        with rpc.batch():
+            rpc.identity.me.scopes()
+        self.assertEqual('identity/me/workspaces', rpc.identity.me.workspaces())
+
+    def test_batch_context_not_sent_on_error(self):
+        rpc = PlainRPCCommon(self.call_rpc)
+        with pytest.raises(ValueError):
+            with rpc.batch():
+                scopes = rpc.identity.me.scopes()
+                raise ValueError()
+        self.assertEqual([], self.calls)
+        with pytest.raises(RuntimeError):
+            scopes.result()
+
+    def test_nested_batches_of_different_rpc_objects(self):
+        other_calls = []
+
+        def other_call_rpc(method_path, params, fire_and_forget=False):
+            other_calls.append(method_path)
+            return method_path
+
+        rpc = PlainRPCCommon(self.call_rpc)
+        other = PlainRPCCommon(other_call_rpc)
+        with rpc.batch():
+            scopes = rpc.identity.me.scopes()
+            with other.batch():
+                workspaces = other.identity.me.workspaces()
+                projects = rpc.analyze.project.projects()
+            self.assertEqual(['identity/me/workspaces'], other_calls)
+            self.assertEqual([], self.calls)
+        self.assertEqual('identity/me/workspaces', workspaces.result())
+        self.assertEqual(['identity/me/scopes', 'analyze/project/projects'], [path for path, _ in self.calls])
+        self.assertEqual('analyze/project/projects', projects.result())
+        self.assertEqual('identity/me/scopes', scopes.result())
+
+    def test_batch_state_does_not_pile_up(self):
+        context_size = len(contextvars.copy_context())
+        for _ in range(1000):
+            rpc = PlainRPCCommon(self.call_rpc)
+            with rpc.batch():
+                rpc.identity.me.scopes()
+        self.assertEqual(context_size, len(contextvars.copy_context()))
+        self.assertIsNone(rpc.active_batch)
+        last_rpc = weakref.ref(rpc)
+        del rpc
+        gc.collect()
+        self.assertIsNone(last_rpc())
+
+
+class TestAsyncBatch(unittest.TestCase):
+
+    """These tests validate batching calls of an rpc object whose batches are sent asynchronously"""
+
+    def setUp(self):
+        self.batches = []
+
+        async def call_rpc(method_path, params, fire_and_forget=False):
+            return method_path
+
+        async def call_rpc_batch(calls):
+            self.batches.append(calls)
+            await asyncio.sleep(0)
+            return tuple(method_path for method_path, _ in calls)
+
+        self.call_rpc = call_rpc
+        self.call_rpc_batch = call_rpc_batch
+
+    def test_batch_is_awaited(self):
+        rpc = PlainRPCCommon(self.call_rpc, call_rpc_batch=self.call_rpc_batch)
+        results = asyncio.run(rpc.batch([rpc.identity.me.scopes, rpc.identity.me.workspaces]))
+        self.assertEqual(('identity/me/scopes', 'identity/me/workspaces'), results)
+
+    def test_skipped_batch_can_still_be_awaited(self):
+        rpc = PlainRPCCommon(self.call_rpc, check_allow_transmit=lambda: False, call_rpc_batch=self.call_rpc_batch)
+        self.assertIsNone(asyncio.run(rpc.batch([rpc.identity.me.scopes])))
+        self.assertEqual([], self.batches)
+
+    def test_async_batch_context_collects_calls(self):
+        rpc = PlainRPCCommon(self.call_rpc, call_rpc_batch=self.call_rpc_batch)
+
+        async def run():
+            async with rpc.batch():
+                scopes = rpc.identity.me.scopes()
+                workspaces = rpc.identity.me.workspaces(active=True)
+            return scopes.result(), workspaces.result()
+
+        self.assertEqual(('identity/me/scopes', 'identity/me/workspaces'), asyncio.run(run()))
+        self.assertEqual([[('identity/me/scopes', {}), ('identity/me/workspaces', {'active': True})]], self.batches)
+
+    def test_concurrent_tasks_batch_separately(self):
+        rpc = PlainRPCCommon(self.call_rpc, call_rpc_batch=self.call_rpc_batch)
+
+        async def collect(method):
+            async with rpc.batch():
+                result = getattr(rpc.identity.me, method)()
+                await asyncio.sleep(0.01)
+            return result.result()
+
+        async def run():
+            return await asyncio.gather(collect('scopes'), collect('workspaces'))
+
+        self.assertEqual(['identity/me/scopes', 'identity/me/workspaces'], asyncio.run(run()))
+        self.assertEqual(2, len(self.batches))
+
+    def test_sync_batch_context_is_refused(self):
+        rpc = PlainRPCCommon(self.call_rpc, call_rpc_batch=self.call_rpc_batch)
+        with pytest.raises(TypeError):
+            with rpc.batch():
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
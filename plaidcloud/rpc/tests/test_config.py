@@ -1,10 +1,16 @@
 #!/usr/bin/env python
 # coding=utf-8
 
+import os
+import shutil
+import tempfile
 import unittest
+from unittest import mock
 import pytest
 
-from plaidcloud.rpc.config import PlaidConfig
+from plaidcloud.rpc.config import (
+    PlaidConfig, _load_config_dir, _load_yaml_file, _makedirs_once, convert_plaid_conf, find_workspace_root,
+)
 
 __author__ = "Pat Buxton"
 __copyright__ = "© Copyright 2022, Tartan Solutions, Inc"
@@ -27,5 +33,185 @@ class TestConfigWithNoPaths(unittest.TestCase):
         with pytest.raises(Exception):
             x = self.config.path('something')
 
+    def test_settings_are_not_shared_between_instances(self):
+        other = PlaidConfig(config_path='plaidcloud/rpc/tests/.plaid/plaid.conf')
+        other.all['something'] = 'else'
+        assert 'something' not in self.config.all
+
     def tearDown(self):
         pass
+
+
+class TestConfigWithPaths(unittest.TestCase):
+    """These tests validate path resolution in the PlaidConfig object"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        shutil.copy('plaidcloud/rpc/tests/.plaid/plaid.conf', self.root)
+        with open(os.path.join(self.root, 'paths.yaml'), 'w') as fp:
+            fp.write(
+                'paths:\n'
+                '  PROJECT_ROOT: ' + self.root + '/{WORKING_USER}\n'
+                '  LOCAL_STORAGE: "{PROJECT_ROOT}/local"\n'
+                '  DEBUG: "{PROJECT_ROOT}/debug"\n'
+                '  REPORTS: "{PROJECT_ROOT}/reports"\n'
+                '  EXPORTS: "{LOCAL_STORAGE}//exports/{UNKNOWN}"\n'
+                '  create: []\n'
+            )
+        self.config = PlaidConfig(config_path=os.path.join(self.root, 'plaid.conf'), working_user='someone')
+
+    def test_resolves_nested_templates(self):
+        assert self.config.path('LOCAL_STORAGE') == os.path.join(self.root, 'someone', 'local')
+
+    def test_keeps_unknown_placeholders(self):
+        assert self.config.path('EXPORTS') == os.path.join(self.root, 'someone', 'local', 'exports', '{UNKNOWN}')
+
+    def test_resolves_paths_added_later(self):
+        self.config.paths['LATER'] = '{DEBUG}/later'
+        assert self.config.path('LATER') == os.path.join(self.root, 'someone', 'debug', 'later')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+
+class TestConfigFromEnvironment(unittest.TestCase):
+    """These tests validate configuring PlaidConfig from environment variables"""
+
+    def setUp(self):
+        self.environ = {
+            '__PLAID_RPC_URI__': 'https://upstream.location/json-rpc/',
+            '__PLAID_RPC_AUTH_TOKEN__': 'some_token',
+            '__PLAID_PROJECT_ID__': 'some_project_id',
+            '__PLAID_WORKSPACE_UUID__': 'some_workspace_uuid',
+            '__PLAID_WORKFLOW_ID__': 'some_workflow_id',
+            '__PLAID_STEP_ID__': 'some_step_id',
+        }
+
+    def test_uses_environment(self):
+        with mock.patch.dict(os.environ, self.environ, clear=True):
+            config = PlaidConfig(config_path=None)
+        assert not config.is_local
+        assert config.hostname == 'upstream.location'
+        assert config.step_id == 'some_step_id'
+
+    def test_falls_back_to_local_when_incomplete(self):
+        del self.environ['__PLAID_STEP_ID__']
+        with mock.patch.dict(os.environ, self.environ, clear=True):
+            config = PlaidConfig(config_path='plaidcloud/rpc/tests/.plaid/plaid.conf')
+        assert config.is_local
+
+
+class TestLoadYamlFile(unittest.TestCase):
+    """These tests validate the cached yaml file loading"""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.yaml')
+        with os.fdopen(handle, 'w') as fp:
+            fp.write('paths:\n  PROJECT_ROOT: /tmp\n')
+
+    def test_returns_parsed_yaml(self):
+        assert _load_yaml_file(self.path) == {'paths': {'PROJECT_ROOT': '/tmp'}}
+
+    def test_result_is_a_copy(self):
+        _load_yaml_file(self.path)['paths']['PROJECT_ROOT'] = '/changed'
+        assert _load_yaml_file(self.path)['paths']['PROJECT_ROOT'] == '/tmp'
+
+    def test_reloads_changed_file(self):
+        _load_yaml_file(self.path)
+        with open(self.path, 'w') as fp:
+            fp.write('paths:\n  PROJECT_ROOT: /somewhere/else\n')
+        assert _load_yaml_file(self.path)['paths']['PROJECT_ROOT'] == '/somewhere/else'
+
+    def tearDown(self):
+        os.remove(self.path)
+
+
+class TestJsonPlaidConf(unittest.TestCase):
+    """These tests validate reading plaid.conf converted to json"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.yaml_path = os.path.join(self.root, 'plaid.conf')
+        shutil.copy('plaidcloud/rpc/tests/.plaid/plaid.conf', self.yaml_path)
+
+    def test_converted_config_matches_yaml(self):
+        json_path = convert_plaid_conf(self.yaml_path)
+        assert json_path == self.yaml_path + '.json'
+        assert PlaidConfig(config_path=json_path).config == PlaidConfig(config_path=self.yaml_path).config
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+
+class TestLoadConfigDir(unittest.TestCase):
+    """These tests validate the cached loading of a config directory"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        with open(os.path.join(self.root, 'a.yaml'), 'w') as fp:
+            fp.write('a: 1\n')
+        with open(os.path.join(self.root, '__skipped.yaml'), 'w') as fp:
+            fp.write('skipped: 1\n')
+
+    def test_merges_yaml_files(self):
+        with open(os.path.join(self.root, 'b.yaml'), 'w') as fp:
+            fp.write('b: 2\n')
+        assert _load_config_dir(self.root) == {'a': 1, 'b': 2}
+
+    def test_reloads_file_changed_in_place(self):
+        _load_config_dir(self.root)
+        with open(os.path.join(self.root, 'a.yaml'), 'w') as fp:
+            fp.write('a: 100\n')
+        assert _load_config_dir(self.root) == {'a': 100}
+
+    def test_missing_directory_is_empty(self):
+        assert _load_config_dir(os.path.join(self.root, 'missing')) == {}
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+
+class TestMakedirsOnce(unittest.TestCase):
+    """These tests validate that config directories are only created once per process"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def test_creates_missing_directory(self):
+        path = os.path.join(self.root, 'a', 'b')
+        _makedirs_once(path)
+        assert os.path.isdir(path)
+
+    def test_skips_directory_already_created(self):
+        path = os.path.join(self.root, 'c')
+        _makedirs_once(path)
+        with mock.patch('plaidcloud.rpc.config.makedirs') as makedirs:
+            _makedirs_once(path)
+        makedirs.assert_not_called()
+
+    def test_recreates_directory_removed_since(self):
+        path = os.path.join(self.root, 'd')
+        _makedirs_once(path)
+        os.rmdir(path)
+        _makedirs_once(path)
+        assert os.path.isdir(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+
+class TestFindWorkspaceRoot(unittest.TestCase):
+    """These tests validate searching upwards for the workspace root"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, '.plaid'))
+        open(os.path.join(self.root, '.plaid', 'plaid.conf'), 'w').close()
+        self.nested = os.path.join(self.root, 'a', 'b', 'c')
+        os.makedirs(self.nested)
+
+    def test_finds_root_from_nested_path(self):
+        assert str(find_workspace_root(self.nested)) == os.path.realpath(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
@@ -0,0 +1,71 @@
+# coding=utf-8
+
+import base64
+import time
+import unittest
+from unittest import mock
+
+import orjson as json
+
+from plaidcloud.rpc.create_oauth_token import create_oauth_token, refresh_token, token_is_expired
+
+__author__ = "Paul Morel"
+__copyright__ = "© Copyright 2010-2024, Tartan Solutions, Inc"
+__credits__ = ["Paul Morel"]
+__license__ = "Apache 2.0"
+__maintainer__ = "Paul Morel"
+__email__ = "paul.morel@tartansolutions.com"
+
+
+def _make_token(claims):
+    def encode(segment):
+        return base64.urlsafe_b64encode(json.dumps(segment)).rstrip(b'=').decode('ascii')
+    return f"{encode({'alg': 'RS256', 'typ': 'JWT'})}.{encode(claims)}.signature"
+
+
+class TestTokenIsExpired(unittest.TestCase):
+    """These tests validate reading the expiry of a JWT"""
+
+    def test_expired_token(self):
+        self.assertTrue(token_is_expired(_make_token({'exp': int(time.time()) - 60})))
+
+    def test_current_token(self):
+        self.assertFalse(token_is_expired(_make_token({'exp': int(time.time()) + 3600, 'sub': 'someone'})))
+
+    def test_token_without_expiry(self):
+        self.assertIs(token_is_expired(_make_token({'sub': 'someone'})), False)
+
+
+
+class TestTokenRequestBody(unittest.TestCase):
+    """These tests validate the form encoded bodies sent to the token endpoint"""
+
+    def setUp(self):
+        patcher = mock.patch('plaidcloud.rpc.create_oauth_token._get_session')
+        self.post = patcher.start().return_value.post
+        self.post.return_value.content = b'{"access_token": "token"}'
+        self.addCleanup(patcher.stop)
+
+    def sent_body(self):
+        return self.post.call_args.kwargs['data']
+
+    def test_client_credentials_without_secret(self):
+        create_oauth_token('client_credentials', 'client', None, uri='https://auth.example.com/')
+        self.assertEqual(self.sent_body(), b'grant_type=client_credentials&scope=openid&client_id=client')
+
+    def test_password_grant_escapes_values(self):
+        create_oauth_token('password', 'client', 's&cret', scopes='openid email', username='me@example.com',
+                           password='p=ss word')
+        self.assertEqual(
+            self.sent_body(),
+            b'grant_type=password&scope=openid+email&client_id=client&client_secret=s%26cret'
+            b'&username=me%40example.com&password=p%3Dss+word',
+        )
+
+    def test_refresh_token(self):
+        refresh_token('password', 'client', 'refresh')
+        self.assertEqual(self.sent_body(), b'grant_type=password&client_id=client&refresh_token=refresh')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,7 +11,10 @@ test_deps = [
 ]
 
 extras = {
-    'test': test_deps
+    'test': test_deps,
+    'async': ['aiohttp'],
+    'http2': ['httpx[http2]>=0.26'],
+    'arrow': ['pyarrow>=11'],
 }
 
 from os import path